@@ -1,9 +1,10 @@
 """Command-line interface for the dot-context tool."""
 
-import typer
+import functools
+import os
+import click
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
-from rich.table import Table
-from rich.markdown import Markdown
 from pathlib import Path
 from typing import Optional, List
 
@@ -12,44 +13,11 @@ from . import __version__
 from .config import load_config, find_config_file
 from .context_sets import load_context_sets, get_context_set_files
 from .utils.tokens import count_tokens_in_file, format_token_count
-from .query import execute_query
 
-app = typer.Typer(help="A CLI tool for configurable LLM context")
-console = Console()
+console = Console(highlight=False)
 
-
-@app.callback()
-def callback():
-    """A CLI tool for configurable LLM context."""
-
-
-@app.command()
-def version():
-    """Show the version of dot-context."""
-    console.print(f"dot-context version: {__version__}")
-
-
-@app.command()
-def init(
-    path: Optional[Path] = typer.Option(
-        None, "--path", "-p", help="Path where to create the .context file"
-    )
-):
-    """Initialize a new .context configuration file."""
-    target_path = Path.cwd() if path is None else path
-    config_path = target_path / ".context"
-
-    if config_path.exists():
-        console.print(
-            f"[yellow]Warning:[/yellow] .context file already exists at {config_path}"
-        )
-        overwrite = typer.confirm("Do you want to overwrite it?")
-        if not overwrite:
-            console.print("Initialization cancelled.")
-            return
-
-    # Sample configuration
-    sample_config = """# Dot Context Configuration
+# Sample configuration written by `dcx init`
+SAMPLE_CONFIG = """# Dot Context Configuration
 
 Sets:
   example:
@@ -83,9 +51,84 @@ Models:
     model: gemini-2.0-flash # Replace with your desired Gemini model
     description: "Google Gemini model (using OpenAI compatibility)"
 """
+SAMPLE_CONFIG_BYTES = SAMPLE_CONFIG.encode("utf-8")
+
+
+# Shared --file option for commands that read a .context file
+file_option = click.option(
+    "--file",
+    "-f",
+    "config_path",
+    type=click.Path(path_type=Path),
+    help="Path to .context file",
+)
 
-    with open(config_path, "w", encoding="utf-8") as f:
-        f.write(sample_config)
+
+def _resolve_config(config_path: Optional[Path]) -> Path:
+    """
+    Resolve the .context file a command should use.
+
+    Args:
+        config_path: Path given with --file, or None to search for one
+
+    Returns:
+        The path to use
+
+    Raises:
+        click.exceptions.Exit: If no path was given and no .context file could be found
+    """
+    if config_path is not None:
+        return config_path
+
+    found_path = find_config_file()
+    if found_path is None:
+        console.print("[yellow]No .context file found.[/yellow]")
+        console.print("Run [bold]dcx init[/bold] to create one.")
+        raise click.exceptions.Exit()
+
+    console.print(f"Using config file: [bold]{found_path}[/bold]")
+    return found_path
+
+
+@click.group()
+def app():
+    """A CLI tool for configurable LLM context."""
+
+
+@app.command()
+def version():
+    """Show the version of dot-context."""
+    console.print(f"dot-context version: {__version__}")
+
+
+@app.command()
+@click.option(
+    "--path",
+    "-p",
+    type=click.Path(path_type=Path),
+    help="Path where to create the .context file",
+)
+@click.option(
+    "--force",
+    "-F",
+    is_flag=True,
+    help="Overwrite an existing .context without prompting",
+)
+def init(path: Optional[Path], force: bool):
+    """Initialize a new .context configuration file."""
+    target_path = Path.cwd() if path is None else path
+    config_path = target_path / ".context"
+
+    if config_path.exists() and not force:
+        console.print(
+            f"[yellow]Warning:[/yellow] .context file already exists at {config_path}"
+        )
+        overwrite = click.confirm("Do you want to overwrite it?")
+        if not overwrite:
+            console.print("Initialization cancelled.")
+            return
+
+    config_path.write_bytes(SAMPLE_CONFIG_BYTES)
 
     console.print(f"[green]Successfully created[/green] .context file at {config_path}")
     console.print("\nTo use this configuration:")
@@ -104,24 +147,14 @@ Models:
 
 
 @app.command()
-def config(
-    config_path: Optional[Path] = typer.Option(
-        None, "--file", "-f", help="Path to .context file"
-    )
-):
+@file_option
+def config(config_path: Optional[Path]):
     """Display the current configuration."""
-    try:
-        # If no config path provided, search for one
-        if config_path is None:
-            found_path = find_config_file()
-            if found_path:
-                config_path = found_path
-                console.print(f"Using config file: [bold]{config_path}[/bold]")
-            else:
-                console.print("[yellow]No .context file found.[/yellow]")
-                console.print("Run [bold]dcx init[/bold] to create one.")
-                return
+    from rich.table import Table
+
+    config_path = _resolve_config(config_path)
 
+    try:
         # Load and display the configuration
         config_data = load_config(config_path)
 
@@ -171,28 +204,20 @@ def config(
 
 
 # Create a sub-command group for sets
-sets_app = typer.Typer(help="Manage context sets")
-app.add_typer(sets_app, name="sets")
+@app.group("sets")
+def sets_app():
+    """Manage context sets"""
 
 
 @sets_app.command("list")
-def list_sets(
-    config_path: Optional[Path] = typer.Option(
-        None, "--file", "-f", help="Path to .context file"
-    )
-):
+@file_option
+def list_sets(config_path: Optional[Path]):
     """List all available context sets."""
-    try:
-        if config_path is None:
-            found_path = find_config_file()
-            if found_path:
-                config_path = found_path
-                console.print(f"Using config file: [bold]{config_path}[/bold]")
-            else:
-                console.print("[yellow]No .context file found.[/yellow]")
-                console.print("Run [bold]dcx init[/bold] to create one.")
-                return
+    from rich.table import Table
+
+    config_path = _resolve_config(config_path)
 
+    try:
         context_sets = load_context_sets(config_path)
 
         if not context_sets:
@@ -219,31 +244,30 @@ def list_sets(
 
 
 @sets_app.command("show")
-def show_set(
-    set_name: str = typer.Argument(
-        ..., help="Name of the context set to show (comma-separated for multiple sets)"
-    ),
-    config_path: Optional[Path] = typer.Option(
-        None, "--file", "-f", help="Path to .context file"
-    ),
-):
+@click.argument("set_name")
+@click.option(
+    "--estimate",
+    is_flag=True,
+    help="Estimate tokens from file sizes instead of reading the files",
+)
+@file_option
+def show_set(set_name: str, estimate: bool, config_path: Optional[Path]):
     """
     Show files in one or more context sets.
 
+    SET_NAME: Name of the context set to show (comma-separated for multiple
+    sets)
+
+    \b
     You can specify multiple context sets by separating them with commas:
     dcx sets show code,tests
     """
-    try:
-        if config_path is None:
-            found_path = find_config_file()
-            if found_path:
-                config_path = found_path
-                console.print(f"Using config file: [bold]{config_path}[/bold]")
-            else:
-                console.print("[yellow]No .context file found.[/yellow]")
-                console.print("Run [bold]dcx init[/bold] to create one.")
-                return
+    from rich.table import Table
+    from rich.text import Text
+
+    config_path = _resolve_config(config_path)
 
+    try:
         # Check if we have multiple sets (comma-separated)
         set_names = [s.strip() for s in set_name.split(",")]
         all_files = []
@@ -296,20 +320,27 @@ def show_set(
         total_size = 0
         total_tokens = 0
 
-        for file_path in unique_files:
-            # Get token count and size
-            file_info = count_tokens_in_file(file_path)
-            size = file_info["size_bytes"]
-            tokens = file_info["tokens"]
+        # Read and tokenize files concurrently; map() keeps results in order
+        count_file = functools.partial(count_tokens_in_file, estimate=estimate)
+        max_workers = min(32, (os.cpu_count() or 4) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for file_path, file_info in zip(
+                unique_files, executor.map(count_file, unique_files)
+            ):
+                # Get token count and size
+                size = file_info.size_bytes
+                tokens = file_info.tokens
 
-            # Update totals
-            total_size += size
-            total_tokens += tokens
+                # Update totals
+                total_size += size
+                total_tokens += tokens
 
-            # Format token count
-            formatted_tokens = format_token_count(tokens)
+                # Format token count
+                formatted_tokens = format_token_count(tokens)
 
-            table.add_row(str(file_path), str(size), formatted_tokens)
+                # Text skips markup parsing, which also keeps names
+                # containing [brackets] intact
+                table.add_row(Text(str(file_path)), str(size), formatted_tokens)
 
         console.print(table)
 
@@ -337,28 +368,20 @@ def show_set(
 
 
 # Create a models sub-command group
-models_app = typer.Typer(help="Manage LLM models")
-app.add_typer(models_app, name="models")
+@app.group("models")
+def models_app():
+    """Manage LLM models"""
 
 
 @models_app.command("list")
-def list_models(
-    config_path: Optional[Path] = typer.Option(
-        None, "--file", "-f", help="Path to .context file"
-    )
-):
+@file_option
+def list_models(config_path: Optional[Path]):
     """List all available models."""
-    try:
-        if config_path is None:
-            found_path = find_config_file()
-            if found_path:
-                config_path = found_path
-                console.print(f"Using config file: [bold]{config_path}[/bold]")
-            else:
-                console.print("[yellow]No .context file found.[/yellow]")
-                console.print("Run [bold]dcx init[/bold] to create one.")
-                return
+    from rich.table import Table
 
+    config_path = _resolve_config(config_path)
+
+    try:
         config_data = load_config(config_path)
         models = config_data.get("Models", {})
 
@@ -387,26 +410,39 @@ def list_models(
 
 
 @app.command("history")
+@click.argument("entry_id", required=False)
+@click.option(
+    "--max",
+    "-m",
+    "max_entries",
+    default=5,
+    show_default=True,
+    help="Maximum number of entries to display in list view",
+)
+@click.option(
+    "--save",
+    "-s",
+    "save_path",
+    type=click.Path(path_type=Path),
+    help="Save the entry to a file",
+)
 def history_command(
-    entry_id: Optional[str] = typer.Argument(
-        None, help="ID of the history entry to view (omit to list recent history)"
-    ),
-    max_entries: int = typer.Option(
-        5, "--max", "-m", help="Maximum number of entries to display in list view"
-    ),
-    save_path: Optional[Path] = typer.Option(
-        None, "--save", "-s", help="Save the entry to a file"
-    ),
+    entry_id: Optional[str], max_entries: int, save_path: Optional[Path]
 ):
     """
     View query history.
 
+    ENTRY_ID: ID of the history entry to view (omit to list recent history)
+
+    \b
     Use without ID to list recent queries:
         dcx history
 
+    \b
     Use with an ID to view a specific entry:
         dcx history a1b2c3d4
 
+    \b
     Use with --save to save to a file:
         dcx history a1b2c3d4 --save result.md
     """
@@ -427,59 +463,117 @@ def history_command(
 
 
 @app.command()
+@click.argument("query_text")
+@click.option(
+    "--set",
+    "-s",
+    "set_name",
+    required=True,
+    help="Name of the context set to use (comma-separated for multiple sets)",
+)
+@click.option(
+    "--model",
+    "-m",
+    "model_name",
+    required=True,
+    help="Name of the model to use (comma-separated to query several at once)",
+)
+@click.option(
+    "--system", "system_prompt", help="Optional system prompt or instructions"
+)
+@click.option(
+    "--temperature",
+    "-t",
+    type=click.FloatRange(0.0, 2.0),
+    default=0.7,
+    show_default=True,
+    help="Model temperature",
+)
+@click.option("--max-tokens", type=int, help="Maximum tokens to generate")
+@click.option(
+    "--no-stream", is_flag=True, help="Disable streaming (wait for full response)"
+)
+@click.option("--hide-filenames", is_flag=True, help="Exclude filenames from context")
+@click.option("--no-history", is_flag=True, help="Don't save query to history")
+@file_option
 def query(
-    query_text: str = typer.Argument(..., help="The query text to send to the LLM"),
-    set_name: str = typer.Option(
-        ...,
-        "--set",
-        "-s",
-        help="Name of the context set to use (comma-separated for multiple sets)",
-    ),
-    model_name: str = typer.Option(
-        ..., "--model", "-m", help="Name of the model to use"
-    ),
-    system_prompt: Optional[str] = typer.Option(
-        None, "--system", help="Optional system prompt or instructions"
-    ),
-    temperature: float = typer.Option(
-        0.7, "--temperature", "-t", min=0.0, max=2.0, help="Model temperature"
-    ),
-    max_tokens: Optional[int] = typer.Option(
-        None, "--max-tokens", help="Maximum tokens to generate"
-    ),
-    no_stream: bool = typer.Option(
-        False, "--no-stream", help="Disable streaming (wait for full response)"
-    ),
-    hide_filenames: bool = typer.Option(
-        False, "--hide-filenames", help="Exclude filenames from context"
-    ),
-    no_history: bool = typer.Option(
-        False, "--no-history", help="Don't save query to history"
-    ),
-    config_path: Optional[Path] = typer.Option(
-        None, "--file", "-f", help="Path to .context file"
-    ),
+    query_text: str,
+    set_name: str,
+    model_name: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: Optional[int],
+    no_stream: bool,
+    hide_filenames: bool,
+    no_history: bool,
+    config_path: Optional[Path],
 ):
     """
     Query an LLM with one or more context sets.
 
+    QUERY_TEXT: The query text to send to the LLM
+
+    \b
     You can specify multiple context sets by separating them with commas:
     dcx query --set code,tests "How is the test coverage?"
+
+    \b
+    Several models can be queried concurrently in the same way; their
+    responses are not streamed:
+    dcx query --set code --model openai,claude "How is the test coverage?"
     """
-    # Execute the query
-    execute_query(
+    from .daemon import run_via_daemon
+
+    model_names = [m.strip() for m in model_name.split(",")]
+    if len(model_names) > 1:
+        command = "execute_query_batch"
+        kwargs = dict(model_names=model_names)
+    else:
+        command = "execute_query"
+        kwargs = dict(model_name=model_name, stream=not no_stream)
+    kwargs.update(
         query=query_text,
         set_name=set_name,
-        model_name=model_name,
         system_prompt=system_prompt,
         temperature=temperature,
         max_tokens=max_tokens,
-        stream=not no_stream,
         include_filenames=not hide_filenames,
         config_path=config_path,
         save_history=not no_history,
     )
 
+    # Hand the query to a running `dcx serve`, if there is one
+    if run_via_daemon(command, kwargs):
+        return
+
+    # Imported here so other commands don't pay for loading the provider SDKs
+    from . import query as query_module
+
+    # Execute the query
+    getattr(query_module, command)(**kwargs)
+
+
+@app.command()
+def serve():
+    """
+    Serve queries from a long-running process.
+
+    \b
+    Keeps the provider clients, configuration and caches loaded, so later
+    `dcx query` commands skip Python and SDK startup. Queries run in this
+    process with its environment, one at a time. Stop it with Ctrl+C.
+    """
+    from .daemon import get_socket_path, serve as serve_queries
+
+    socket_path = get_socket_path()
+    console.print(f"Serving queries on [bold]{socket_path}[/bold]")
+    try:
+        serve_queries(socket_path)
+    except RuntimeError as e:
+        console.print(f"[red]Error:[/red] {str(e)}")
+    except KeyboardInterrupt:
+        console.print("\n[dim]Server stopped.[/dim]")
+
 
 if __name__ == "__main__":
     app()
@@ -1,20 +1,43 @@
 """Configuration handling for dot-context."""
 
+import copy
+import hashlib
+import json
 import os
-import yaml
+import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional
-from rich.console import Console
+from typing import Dict, Any, Optional, Tuple
 
-console = Console()
+from .console import console
+from .utils.paths import get_cache_dir
 
 DEFAULT_CONFIG_FILE = ".context"
 
+# Parsed configs keyed by resolved path, validated against (mtime_ns, size).
+# The last field records whether the file contains any ${VAR} templates.
+_CONFIG_CACHE: "OrderedDict[str, Tuple[int, int, Dict[str, Any], bool]]" = OrderedDict()
+_CONFIG_CACHE_MAX = 100
+
+# Resolved .context locations keyed by the absolute directory searched from
+_CONFIG_PATH_CACHE: Dict[Path, Path] = {}
+_CONFIG_PATH_CACHE_MAX = 32
+
+# Subdirectory of the cache directory holding parsed configs as JSON, so later
+# processes can skip importing PyYAML and parsing an unchanged file
+CONFIG_CACHE_DIR_NAME = "config"
+
+# Matches ${VAR_NAME} references in configuration values
+_ENV_VAR_RE = re.compile(r"\$\{([^}]+)\}")
+
 
 def find_config_file(start_dir: Optional[Path] = None) -> Optional[Path]:
     """
     Find the closest .context file by walking up directories.
 
+    Successful lookups are remembered per start directory, so repeated calls
+    only need to confirm the cached file still exists.
+
     Args:
         start_dir: The directory to start searching from. Defaults to current directory.
 
@@ -24,8 +47,25 @@ def find_config_file(start_dir: Optional[Path] = None) -> Optional[Path]:
     if start_dir is None:
         start_dir = Path.cwd()
 
-    current_dir = start_dir.absolute()
+    start_dir = start_dir.absolute()
+
+    cached = _CONFIG_PATH_CACHE.get(start_dir)
+    if cached is not None and cached.exists():
+        return cached
+
+    config_path = _walk_for_config_file(start_dir)
+
+    # Only hits are cached, so a .context file created later is still found
+    if config_path is not None:
+        if len(_CONFIG_PATH_CACHE) >= _CONFIG_PATH_CACHE_MAX:
+            _CONFIG_PATH_CACHE.pop(next(iter(_CONFIG_PATH_CACHE)))
+        _CONFIG_PATH_CACHE[start_dir] = config_path
+
+    return config_path
+
 
+def _walk_for_config_file(current_dir: Path) -> Optional[Path]:
+    """Walk up from current_dir and return the first .context file found."""
     # Walk up directory hierarchy until we find a .context file or hit root
     while current_dir != current_dir.parent:
         config_path = current_dir / DEFAULT_CONFIG_FILE
@@ -45,6 +85,11 @@ def load_config(config_path: Optional[Path] = None) -> Dict[str, Any]:
     """
     Load configuration from a .context file.
 
+    Parsed configurations are cached by path, modification time and size,
+    in-process and as JSON in the cache directory, so loads of an unchanged
+    file skip the YAML parse. Environment variables are expanded on every
+    load. Callers always receive a fresh copy they are free to mutate.
+
     Args:
         config_path: Path to the .context file. If None, will search for one.
 
@@ -61,38 +106,154 @@ def load_config(config_path: Optional[Path] = None) -> Dict[str, Any]:
     if config_path is None or not config_path.exists():
         raise FileNotFoundError(f"No {DEFAULT_CONFIG_FILE} file found.")
 
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
+    stat = config_path.stat()
+    cache_key = str(config_path.resolve())
+    cached = _CONFIG_CACHE.get(cache_key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        _CONFIG_CACHE.move_to_end(cache_key)
+        raw_config, has_templates = cached[2], cached[3]
+    else:
+        persisted = _read_persisted_config(cache_key, stat.st_mtime_ns, stat.st_size)
+        if persisted is not None:
+            raw_config, has_templates = persisted
+        else:
+            with open(config_path, "r", encoding="utf-8") as f:
+                raw_text = f.read()
+            raw_config = _parse_yaml(raw_text, config_path)
+            has_templates = "${" in raw_text
+            _write_persisted_config(
+                cache_key, stat.st_mtime_ns, stat.st_size, raw_config, has_templates
+            )
+
+        _CONFIG_CACHE[cache_key] = (
+            stat.st_mtime_ns,
+            stat.st_size,
+            raw_config,
+            has_templates,
+        )
+        while len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX:
+            _CONFIG_CACHE.popitem(last=False)
 
-        # Expand any environment variables in the config
+    config = copy.deepcopy(raw_config)
+
+    # Expand any environment variables in the config. This runs on every load
+    # so changes to the environment are picked up even on a cache hit, but is
+    # skipped entirely for files without any ${VAR} references.
+    if has_templates:
         config = _expand_env_vars(config)
-        return config
+    return config
+
+
+def _parse_yaml(raw_text: str, config_path: Path) -> Any:
+    """Parse a .context file's text, reporting syntax errors to the console."""
+    # PyYAML is slow to import and only needed when no parsed copy is cached
+    import yaml
+
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        return yaml.load(raw_text, Loader=loader)
     except yaml.YAMLError as e:
         console.print(f"[bold red]Error parsing {config_path}:[/bold red]")
         console.print(f"[red]{str(e)}[/red]")
         raise
 
 
+def _persisted_config_path(cache_key: str) -> Path:
+    """Get the JSON cache file for a resolved config path."""
+    digest = hashlib.sha1(cache_key.encode("utf-8")).hexdigest()
+    return get_cache_dir() / CONFIG_CACHE_DIR_NAME / f"{digest}.json"
+
+
+def _read_persisted_config(
+    cache_key: str, mtime_ns: int, size: int
+) -> Optional[Tuple[Any, bool]]:
+    """
+    Read a parsed config from the JSON cache if it matches the file.
+
+    Returns:
+        Tuple of (raw config, has templates), or None on a miss
+    """
+    try:
+        with open(_persisted_config_path(cache_key), "rb") as f:
+            cached = json.loads(f.read())
+        if (
+            cached["path"] == cache_key
+            and cached["mtime_ns"] == mtime_ns
+            and cached["size"] == size
+        ):
+            return cached["config"], cached["has_templates"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_persisted_config(
+    cache_key: str, mtime_ns: int, size: int, raw_config: Any, has_templates: bool
+) -> None:
+    """
+    Save a parsed config to the JSON cache, if JSON can represent it exactly.
+
+    Configs using YAML-only types, such as dates or non-string keys, are not
+    cached. Errors are ignored, as the cache is only an optimization.
+    """
+    entry = {
+        "path": cache_key,
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "has_templates": has_templates,
+        "config": raw_config,
+    }
+    try:
+        data = json.dumps(entry)
+        if json.loads(data)["config"] != raw_config:
+            return
+        cache_path = _persisted_config_path(cache_key)
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial file.
+        # The config may contain literal API keys, so only the owner may read it
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
 def _expand_env_vars(config_item):
     """
-    Recursively expand environment variables in configuration values.
+    Expand environment variables in configuration values.
 
-    Environment variables should be in the format ${VAR_NAME}.
+    Environment variables should be in the format ${VAR_NAME}. Dicts and lists
+    are updated in place using an explicit stack rather than recursion, so
+    callers must pass a copy they own.
     """
-    if isinstance(config_item, dict):
-        return {k: _expand_env_vars(v) for k, v in config_item.items()}
-    if isinstance(config_item, list):
-        return [_expand_env_vars(i) for i in config_item]
     if isinstance(config_item, str):
-        # Expand ${VAR_NAME} syntax to environment variable values
-        if "${" in config_item and "}" in config_item:
-            start = config_item.find("${")
-            end = config_item.find("}", start)
-            if end > start >= 0:
-                env_var = config_item[start + 2 : end]
-                env_val = os.environ.get(env_var, "")
-                return config_item[:start] + env_val + config_item[end + 1 :]
-        return config_item
+        return _expand_str(config_item)
+
+    stack = [config_item]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            continue
+
+        for key, value in items:
+            if isinstance(value, str):
+                if "${" in value:
+                    node[key] = _expand_str(value)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
 
     return config_item
+
+
+def _expand_str(value: str) -> str:
+    """Expand every ${VAR_NAME} in a string to its environment variable value."""
+    if "${" not in value:
+        return value
+    return _ENV_VAR_RE.sub(lambda m: os.environ.get(m.group(1), ""), value)
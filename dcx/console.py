@@ -0,0 +1,7 @@
+"""Shared console for dot-context output."""
+
+from rich.console import Console
+
+# One console for the whole package, so output settings and redirection
+# apply everywhere
+console = Console()
@@ -1,14 +1,179 @@
 """Context set management for dot-context."""
 
-import glob
+import fnmatch
+import functools
 import os
+import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from rich.console import Console
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
+from .console import console
 
 from .config import load_config, find_config_file
 
-console = Console()
+# Characters that make a pattern component a wildcard rather than a literal name
+_MAGIC_CHARS = re.compile(r"[*?[]")
+
+# Match names case-insensitively where the filesystem does (as glob does)
+_FNMATCH_FLAGS = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+
+# A compiled pattern component: None for "**", a str for a literal name, or a
+# (regex, matches_hidden) pair for a wildcard name
+_Component = Union[None, str, Tuple[Pattern[str], bool]]
+
+# Directory listings shared by every pattern matched in one lookup
+_Listings = Dict[str, List[os.DirEntry]]
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> Tuple[str, Tuple[_Component, ...]]:
+    """
+    Compile a glob pattern into a literal root and per-component matchers.
+
+    Leading literal components are folded into the root so the walk starts
+    as deep as possible, and wildcard components are translated to regexes
+    once instead of on every directory visited.
+
+    Args:
+        pattern: A glob pattern relative to the set's base directory, or absolute
+
+    Returns:
+        Tuple of (literal root relative to the base directory, components)
+    """
+    parts = [part for part in re.split(r"[\\/]", pattern) if part]
+    root = os.sep if os.path.isabs(pattern) else ""
+    drive, _ = os.path.splitdrive(pattern)
+    if drive:
+        root = drive + os.sep
+        parts = parts[1:]
+
+    while len(parts) > 1 and not _MAGIC_CHARS.search(parts[0]):
+        root = os.path.join(root, parts.pop(0))
+
+    components: List[_Component] = []
+    for part in parts:
+        if part == "**":
+            components.append(None)
+        elif _MAGIC_CHARS.search(part):
+            regex = re.compile(fnmatch.translate(part), _FNMATCH_FLAGS)
+            components.append((regex, part.startswith(".")))
+        else:
+            components.append(part)
+
+    return root, tuple(components)
+
+
+def _iter_entries(dir_path: str, listings: _Listings) -> List[os.DirEntry]:
+    """
+    List a directory, treating unreadable directories as empty.
+
+    Listings are memoized in ``listings`` so overlapping patterns, and the
+    "**" walk followed by per-directory matching, scan each directory once.
+    """
+    key = os.path.normpath(dir_path or os.curdir)
+    entries = listings.get(key)
+    if entries is None:
+        try:
+            with os.scandir(key) as it:
+                entries = list(it)
+        except OSError:
+            entries = []
+        listings[key] = entries
+    return entries
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _is_file(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_file()
+    except OSError:
+        return False
+
+
+def _walk_visible_dirs(dir_path: str, listings: _Listings) -> Iterator[str]:
+    """Yield dir_path and every non-hidden directory below it, as "**" does."""
+    yield dir_path
+    for entry in _iter_entries(dir_path, listings):
+        if not entry.name.startswith(".") and _is_dir(entry):
+            yield from _walk_visible_dirs(os.path.join(dir_path, entry.name), listings)
+
+
+def _match_components(
+    dir_path: str, components: Tuple[_Component, ...], listings: _Listings
+) -> Iterator[str]:
+    """
+    Yield files under dir_path matching the remaining pattern components.
+
+    Only directories that can still match are descended into. Like glob,
+    wildcards do not match hidden names unless the component itself starts
+    with a dot.
+    """
+    component, rest = components[0], components[1:]
+
+    if component is None:
+        if not rest:
+            # A trailing "**" matches every visible file below this directory
+            for sub_dir in _walk_visible_dirs(dir_path, listings):
+                for entry in _iter_entries(sub_dir, listings):
+                    if not entry.name.startswith(".") and _is_file(entry):
+                        yield os.path.join(sub_dir, entry.name)
+        else:
+            for sub_dir in _walk_visible_dirs(dir_path, listings):
+                yield from _match_components(sub_dir, rest, listings)
+        return
+
+    if isinstance(component, str):
+        path = os.path.join(dir_path, component)
+        if not rest:
+            if os.path.isfile(path):
+                yield path
+        elif os.path.isdir(path):
+            yield from _match_components(path, rest, listings)
+        return
+
+    regex, matches_hidden = component
+    for entry in _iter_entries(dir_path, listings):
+        if entry.name.startswith(".") and not matches_hidden:
+            continue
+        if not regex.match(entry.name):
+            continue
+        path = os.path.join(dir_path, entry.name)
+        if not rest:
+            if _is_file(entry):
+                yield path
+        elif _is_dir(entry):
+            yield from _match_components(path, rest, listings)
+
+
+def _iter_pattern_files(
+    base_dir: Path, pattern: str, listings: _Listings
+) -> Iterator[str]:
+    """Yield paths of files under base_dir matching a glob pattern."""
+    root, components = _compile_pattern(pattern)
+    root = os.path.join(str(base_dir), root)
+
+    if not components:
+        if os.path.isfile(root):
+            yield root
+        return
+
+    yield from _match_components(root, components, listings)
 
 
 class ContextSet:
@@ -28,6 +193,86 @@ class ContextSet:
         self.match_patterns = config.get("match", [])
         self.includes = config.get("include", [])
         self.base_dir = base_dir
+        self._pattern_files: Optional[FrozenSet[str]] = None
+
+    def _iter_pattern_files(self) -> Iterator[str]:
+        """
+        Yield the files matched by this set's own patterns, ignoring includes.
+
+        Files are yielded as they are found. Once the walk has been fully
+        consumed the result is memoized on the instance, so within one
+        lookup a set that is included by several others is only matched
+        against the filesystem once.
+        """
+        if self._pattern_files is not None:
+            yield from self._pattern_files
+            return
+
+        found = set()
+        # Patterns share directory listings so overlapping trees are
+        # scanned only once
+        listings: _Listings = {}
+        for pattern in self.match_patterns:
+            for file_path in _iter_pattern_files(self.base_dir, pattern, listings):
+                if file_path not in found:
+                    found.add(file_path)
+                    yield file_path
+
+        self._pattern_files = frozenset(found)
+
+    def _iter_matching_paths(
+        self,
+        all_sets: Optional[Dict[str, "ContextSet"]] = None,
+        seen: Optional[Set[str]] = None,
+        visited: Optional[Set[str]] = None,
+    ) -> Iterator[str]:
+        """
+        Yield the paths of files matching this set, including included sets.
+
+        Includes are followed transitively. ``visited`` holds the names of the
+        sets already expanded for this lookup, so each set is expanded at most
+        once and circular includes terminate.
+        """
+        if seen is None:
+            seen = set()
+        if visited is None:
+            visited = {self.name}
+
+        # Process direct match patterns, relative to the base directory
+        for file_path in self._iter_pattern_files():
+            if file_path not in seen:
+                seen.add(file_path)
+                yield file_path
+
+        # Process included sets if provided
+        if all_sets is None:
+            return
+        for include_name in self.includes:
+            if include_name in visited:
+                continue
+            visited.add(include_name)
+            included_set = all_sets.get(include_name)
+            if included_set is None:
+                console.print(
+                    f"[yellow]Warning:[/yellow] Included set '{include_name}' not found"
+                )
+                continue
+            yield from included_set._iter_matching_paths(all_sets, seen, visited)
+
+    def iter_matching_files(
+        self, all_sets: Optional[Dict[str, "ContextSet"]] = None
+    ) -> Iterator[Path]:
+        """
+        Yield files matching this context set in discovery order, without duplicates.
+
+        Args:
+            all_sets: Dictionary of all available context sets, for resolving includes
+
+        Returns:
+            Iterator over file paths matching this context set
+        """
+        for file_path in self._iter_matching_paths(all_sets):
+            yield Path(file_path)
 
     def get_matching_files(
         self, all_sets: Optional[Dict[str, "ContextSet"]] = None
@@ -39,39 +284,21 @@ class ContextSet:
             all_sets: Dictionary of all available context sets, for resolving includes
 
         Returns:
-            List of file paths matching this context set
+            List of file paths matching this context set, sorted by path string
         """
-        matching_files = set()
-
-        # Process direct match patterns
-        for pattern in self.match_patterns:
-            # Ensure the pattern is relative to the base directory
-            full_pattern = os.path.join(self.base_dir, pattern)
-            for file_path in glob.glob(full_pattern, recursive=True):
-                if os.path.isfile(file_path):
-                    matching_files.add(Path(file_path))
-
-        # Process included sets if provided
-        if all_sets is not None:
-            for include_name in self.includes:
-                if include_name in all_sets:
-                    included_set = all_sets[include_name]
-                    # Avoid circular includes by not passing all_sets down
-                    if include_name != self.name:
-                        included_files = included_set.get_matching_files()
-                        matching_files.update(included_files)
-                else:
-                    console.print(
-                        f"[yellow]Warning:[/yellow] Included set '{include_name}' not found"
-                    )
-
-        return sorted(list(matching_files))
+        # Paths are matched and sorted as plain strings, and only wrapped in
+        # Path objects once at the end
+        return [Path(p) for p in sorted(self._iter_matching_paths(all_sets))]
 
 
 def load_context_sets(config_path: Optional[Path] = None) -> Dict[str, ContextSet]:
     """
     Load all context sets from the configuration.
 
+    Sets are built afresh on every call, so their matched files reflect the
+    filesystem at the time of the lookup. The parsed configuration itself is
+    cached by load_config.
+
     Args:
         config_path: Path to the .context file. If None, will search for one.
 
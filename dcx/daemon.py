@@ -0,0 +1,219 @@
+"""Persistent query server for dot-context.
+
+`dcx serve` keeps one process running behind a Unix socket, so the provider
+SDKs, their HTTP connections, parsed configuration, the tokenizer and the
+caches stay loaded between queries. `dcx query` sends its arguments to the
+server when one is listening and falls back to running in-process otherwise.
+
+This module is imported by every `dcx query`, so it only uses the standard
+library at import time.
+"""
+
+import json
+import os
+import shutil
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+from .utils.paths import get_cache_dir
+
+SOCKET_FILE_NAME = "dcx.sock"
+
+# Unix sockets are not available on every platform (e.g. older Windows)
+DAEMON_AVAILABLE = hasattr(socket, "AF_UNIX")
+
+# Query functions a client may ask the server to run
+_COMMANDS = ("execute_query", "execute_query_batch")
+
+# Size of the blocks the client copies from the socket to stdout
+_READ_SIZE = 4096
+
+# The server runs one query at a time, since each query redirects the shared
+# console and changes to the client's working directory
+_request_lock = threading.Lock()
+
+
+def get_socket_path() -> Path:
+    """Get the path of the server's Unix socket."""
+    if os.environ.get("DCX_SOCKET"):
+        return Path(os.environ["DCX_SOCKET"])
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / SOCKET_FILE_NAME
+    return get_cache_dir() / SOCKET_FILE_NAME
+
+
+class _ClientWriter:
+    """Text stream that forwards console output to a connected client."""
+
+    def __init__(self, wfile: BinaryIO, isatty: bool):
+        self._wfile = wfile
+        self._isatty = isatty
+
+    def write(self, text: str) -> int:
+        self._wfile.write(text.encode("utf-8"))
+        # Flush every write so streamed responses reach the client as they arrive
+        self._wfile.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        self._wfile.flush()
+
+    def isatty(self) -> bool:
+        return self._isatty
+
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """Run one query for a client and stream its output back."""
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            command = request["command"]
+            if command not in _COMMANDS:
+                raise ValueError(f"Unknown command '{command}'")
+            kwargs = dict(request.get("kwargs") or {})
+            if kwargs.get("config_path") is not None:
+                kwargs["config_path"] = Path(kwargs["config_path"])
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._write_error(f"Error: invalid request: {e}\n")
+            return
+
+        from . import query
+        from .console import console
+
+        # Prompts would be read from the server's stdin, not the client's
+        kwargs["interactive"] = False
+
+        with _request_lock:
+            old_cwd = os.getcwd()
+            console.file = _ClientWriter(self.wfile, bool(request.get("isatty")))
+            try:
+                if request.get("width"):
+                    console.width = request["width"]
+                os.chdir(request["cwd"])
+                getattr(query, command)(**kwargs)
+            except ConnectionError:
+                # The client went away
+                pass
+            except Exception as e:
+                # e.g. an unknown keyword argument or a missing directory
+                self._write_error(f"Error: {e}\n")
+            finally:
+                os.chdir(old_cwd)
+                # The shared console is created with the defaults, which
+                # follow sys.stdout and the terminal size
+                console.file = None
+                console.width = None
+
+    def _write_error(self, message: str) -> None:
+        """Send an error message to the client, if it is still connected."""
+        try:
+            self.wfile.write(message.encode("utf-8"))
+        except OSError:
+            pass
+
+
+class QueryServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server that runs queries in this process."""
+
+    daemon_threads = True
+
+
+def serve(socket_path: Optional[Path] = None) -> None:
+    """
+    Serve queries on a Unix socket until interrupted.
+
+    Args:
+        socket_path: Socket to listen on. If None, uses get_socket_path().
+
+    Raises:
+        RuntimeError: If Unix sockets are unsupported or a server is already running
+    """
+    if not DAEMON_AVAILABLE:
+        raise RuntimeError("dcx serve requires Unix domain sockets")
+
+    if socket_path is None:
+        socket_path = get_socket_path()
+
+    if socket_path.exists():
+        if _is_listening(socket_path):
+            raise RuntimeError(f"A server is already listening on {socket_path}")
+        # Left behind by a server that did not shut down cleanly
+        socket_path.unlink()
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    # Import the query machinery up front so the first query is fast too
+    from . import query  # noqa: F401
+
+    with QueryServer(str(socket_path), _QueryHandler) as server:
+        os.chmod(socket_path, 0o600)
+        try:
+            server.serve_forever()
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def _is_listening(socket_path: Path) -> bool:
+    """Check whether a server is accepting connections on a socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+
+
+def run_via_daemon(command: str, kwargs: Dict[str, Any]) -> bool:
+    """
+    Run a query function on the server, if one is listening.
+
+    The server's output is copied to stdout as it arrives.
+
+    Args:
+        command: Name of the function in dcx.query to run
+        kwargs: Its keyword arguments; Path values are sent as absolute paths
+
+    Returns:
+        True if the server ran the query, False if no server is listening
+    """
+    if not DAEMON_AVAILABLE:
+        return False
+
+    socket_path = get_socket_path()
+    if not socket_path.exists():
+        return False
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return False
+
+    request = {
+        "command": command,
+        "kwargs": {
+            key: os.path.abspath(value) if isinstance(value, Path) else value
+            for key, value in kwargs.items()
+        },
+        "cwd": os.getcwd(),
+        "width": shutil.get_terminal_size().columns,
+        "isatty": sys.stdout.isatty(),
+    }
+
+    with sock:
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        out = sys.stdout.buffer
+        while True:
+            data = sock.recv(_READ_SIZE)
+            if not data:
+                break
+            out.write(data)
+            out.flush()
+    return True
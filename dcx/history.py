@@ -1,30 +1,232 @@
 """History management for dot-context queries."""
 
+import functools
 import os
 import json
+import mmap
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterator, List, Any, Optional, Union
 
-from rich.console import Console
+from .console import console
 from rich.table import Table
 from rich.markdown import Markdown
 
-console = Console()
+# Use orjson for faster history (de)serialization when it is installed
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Default history file location in user's home directory
 DEFAULT_HISTORY_DIR = os.path.join(os.path.expanduser("~"), ".dcx", "history")
 
+# Append-only log with one full entry per line, oldest first. Older versions
+# stored each entry in its own <id>.json file, which are still read.
+LOG_FILE_NAME = "history.ndjson"
+
+# Append-only manifest with one summary line per entry, oldest first
+INDEX_FILE_NAME = "index.jsonl"
+
+# Block size used when reading the history index backwards
+TAIL_READ_SIZE = 64 * 1024
+
+# Number of query characters kept for the history list preview
+QUERY_PREVIEW_LENGTH = 40
+
+# Number of threads used to read per-entry history files when rebuilding the index
+HISTORY_READ_WORKERS = 8
+
+# Templates used by save_entry_to_file, filled from the entry plus a formatted date
+_MARKDOWN_EXPORT_TEMPLATE = (
+    "# Query: {query}\n\n"
+    "**Date:** {date}\n"
+    "**Context Set:** {set_name}\n"
+    "**Model:** {model_name}\n"
+    "**Files:** {files_count}\n"
+    "**Tokens:** {token_count}\n\n"
+    "## Response\n\n"
+    "{response}"
+)
+
+_TEXT_EXPORT_TEMPLATE = (
+    "Query: {query}\n\n"
+    "Date: {date}\n"
+    "Context Set: {set_name}\n"
+    "Model: {model_name}\n"
+    "Files: {files_count}\n"
+    "Tokens: {token_count}\n\n"
+    "Response:\n\n{response}"
+)
+
+
+def _dumps(obj: Any, indent: bool = True) -> bytes:
+    """Serialize an object to UTF-8 JSON, indented unless indent is False."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialize UTF-8 JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 def get_history_dir() -> Path:
     """Get the directory for history files."""
-    history_dir = os.environ.get("DCX_HISTORY_DIR", DEFAULT_HISTORY_DIR)
+    return _ensure_history_dir(os.environ.get("DCX_HISTORY_DIR", DEFAULT_HISTORY_DIR))
+
+
+@functools.lru_cache(maxsize=4)
+def _ensure_history_dir(history_dir: str) -> Path:
+    """Create the history directory once per process and location."""
     path = Path(history_dir)
     path.mkdir(parents=True, exist_ok=True)
     return path
 
 
+def _append_line(path: Path, obj: Any) -> None:
+    """Append an object to a JSON-lines file with a single O_APPEND write."""
+    data = _dumps(obj, indent=False) + b"\n"
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _read_log_entries(history_dir: Path) -> List[Dict[str, Any]]:
+    """Read every entry from the history log, oldest first."""
+    log_path = history_dir / LOG_FILE_NAME
+    if not log_path.exists():
+        return []
+
+    entries = []
+    for line in log_path.read_bytes().splitlines():
+        if line.strip():
+            try:
+                entries.append(_loads(line))
+            except Exception as e:
+                console.print(
+                    f"[yellow]Warning:[/yellow] Skipping unreadable history log line: {str(e)}"
+                )
+    return entries
+
+
+def _iter_lines_reversed(path: Path) -> Iterator[bytes]:
+    """
+    Yield the lines of a file from last to first.
+
+    The file is read backwards in blocks, so reading the last few lines of a
+    long file only touches its tail.
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            read_size = min(TAIL_READ_SIZE, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            # The first line may continue in the previous block
+            remainder = lines.pop(0)
+            yield from reversed(lines)
+        yield remainder
+
+
+def _find_log_entry(history_dir: Path, entry_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Find the newest entry with the given ID in the history log.
+
+    The log is memory-mapped and searched backwards for the entry's compact
+    "id" field, so only the matching line is parsed. Quotes inside string
+    values are always escaped, so the needle can only match a real id key.
+    """
+    log_path = history_dir / LOG_FILE_NAME
+    if not log_path.exists() or log_path.stat().st_size == 0:
+        return None
+
+    needle = b'"id":' + _dumps(entry_id, indent=False)
+    with open(log_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while True:
+                pos = mm.rfind(needle, 0, end)
+                if pos < 0:
+                    return None
+                line_start = mm.rfind(b"\n", 0, pos) + 1
+                line_end = mm.find(b"\n", pos)
+                if line_end < 0:
+                    line_end = len(mm)
+                entry = _loads(mm[line_start:line_end])
+                if entry.get("id") == entry_id:
+                    return entry
+                end = line_start
+
+
+def _summarize_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the index summary for a history entry."""
+    query = entry.get("query", "")
+    if len(query) > QUERY_PREVIEW_LENGTH:
+        query = query[:QUERY_PREVIEW_LENGTH] + "..."
+
+    return {
+        "id": entry.get("id", ""),
+        "timestamp": entry.get("timestamp", ""),
+        "set_name": entry.get("set_name", ""),
+        "model_name": entry.get("model_name", ""),
+        "query_preview": query,
+    }
+
+
+def _read_entry_file(file_path: Path) -> Optional[Dict[str, Any]]:
+    """Read a per-entry history file, returning None if it can't be read."""
+    try:
+        return _loads(file_path.read_bytes())
+    except Exception as e:
+        console.print(
+            f"[yellow]Warning:[/yellow] Failed to read history file {file_path}: {str(e)}"
+        )
+        return None
+
+
+def _rebuild_index(history_dir: Path) -> None:
+    """
+    Recreate the history index from the history log and any per-entry files.
+
+    Used when the index is missing, e.g. for history written by older
+    versions of dot-context.
+    """
+    summaries = [_summarize_entry(entry) for entry in _read_log_entries(history_dir)]
+
+    # Per-entry files are read in parallel, as reading many small files is
+    # dominated by I/O latency rather than parsing
+    with ThreadPoolExecutor(max_workers=HISTORY_READ_WORKERS) as executor:
+        for entry in executor.map(_read_entry_file, history_dir.glob("*.json")):
+            if entry is not None:
+                summaries.append(_summarize_entry(entry))
+
+    # The index is kept oldest first
+    summaries.sort(key=lambda x: x.get("timestamp", ""))
+
+    # Write to a temporary file first, so readers and concurrent appends never
+    # see a partially written index
+    index_path = history_dir / INDEX_FILE_NAME
+    tmp_path = history_dir / f"{INDEX_FILE_NAME}.{os.getpid()}.tmp"
+    tmp_path.write_bytes(
+        b"".join(_dumps(summary, indent=False) + b"\n" for summary in summaries)
+    )
+    os.replace(tmp_path, index_path)
+
+
 def save_query_to_history(
     query: str,
     response: str,
@@ -68,43 +270,55 @@ def save_query_to_history(
         "execution_time": execution_time,
     }
 
-    # Save to file
-    history_file = history_dir / f"{entry_id}.json"
-    with open(history_file, "w", encoding="utf-8") as f:
-        json.dump(entry, f, indent=2)
+    # Append to the log
+    _append_line(history_dir / LOG_FILE_NAME, entry)
+
+    # Record the entry in the listing index, creating it first if needed
+    index_path = history_dir / INDEX_FILE_NAME
+    if not index_path.exists():
+        _rebuild_index(history_dir)
+    else:
+        _append_line(index_path, _summarize_entry(entry))
 
     return entry_id
 
 
 def get_history_entries(max_entries: int = 5) -> List[Dict[str, Any]]:
     """
-    Get recent history entries, sorted by timestamp (newest first).
+    Get summaries of recent history entries (newest first).
+
+    Only the tail of the history index is read, so listing does not depend on
+    how many entries have been saved. Use get_history_entry for the full entry.
 
     Args:
         max_entries: Maximum number of entries to return
 
     Returns:
-        List of history entries
+        List of entry summaries with id, timestamp, set_name, model_name and
+        query_preview keys
     """
+    if max_entries <= 0:
+        return []
+
     history_dir = get_history_dir()
-    entries = []
+    index_path = history_dir / INDEX_FILE_NAME
+    if not index_path.exists():
+        _rebuild_index(history_dir)
 
-    # Get all JSON files in the history directory
-    for file_path in history_dir.glob("*.json"):
+    entries = []
+    for line in _iter_lines_reversed(index_path):
+        if len(entries) >= max_entries:
+            break
+        if not line.strip():
+            continue
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                entry = json.load(f)
-                entries.append(entry)
+            entries.append(_loads(line))
         except Exception as e:
             console.print(
-                f"[yellow]Warning:[/yellow] Failed to read history file {file_path}: {str(e)}"
+                f"[yellow]Warning:[/yellow] Skipping unreadable history index line: {str(e)}"
             )
 
-    # Sort by timestamp (newest first)
-    entries.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-
-    # Return only the most recent entries
-    return entries[:max_entries]
+    return entries
 
 
 def get_history_entry(entry_id: str) -> Optional[Dict[str, Any]]:
@@ -118,14 +332,14 @@ def get_history_entry(entry_id: str) -> Optional[Dict[str, Any]]:
         The history entry if found, None otherwise
     """
     history_dir = get_history_dir()
-    history_file = history_dir / f"{entry_id}.json"
-
-    if not history_file.exists():
-        return None
 
     try:
-        with open(history_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # Entries saved by older versions live in their own files
+        history_file = history_dir / f"{entry_id}.json"
+        if history_file.exists():
+            return _loads(history_file.read_bytes())
+
+        return _find_log_entry(history_dir, entry_id)
     except Exception as e:
         console.print(f"[red]Error:[/red] Failed to read history file: {str(e)}")
         return None
@@ -155,33 +369,19 @@ def save_entry_to_file(entry_id: str, output_path: Union[str, Path]) -> bool:
     try:
         if extension == ".json":
             # Save full entry as JSON
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(entry, f, indent=2)
-        elif extension in [".md", ".markdown"]:
-            # Format as markdown
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(f"# Query: {entry['query']}\n\n")
-                f.write(
-                    f"**Date:** {datetime.fromisoformat(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}\n"
-                )
-                f.write(f"**Context Set:** {entry['set_name']}\n")
-                f.write(f"**Model:** {entry['model_name']}\n")
-                f.write(f"**Files:** {entry['files_count']}\n")
-                f.write(f"**Tokens:** {entry['token_count']}\n\n")
-                f.write("## Response\n\n")
-                f.write(entry["response"])
+            output_path.write_bytes(_dumps(entry))
         else:
-            # Default to plain text
+            # Format as markdown, or default to plain text
+            if extension in [".md", ".markdown"]:
+                template = _MARKDOWN_EXPORT_TEMPLATE
+            else:
+                template = _TEXT_EXPORT_TEMPLATE
+
+            date_str = datetime.fromisoformat(entry["timestamp"]).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
             with open(output_path, "w", encoding="utf-8") as f:
-                f.write(f"Query: {entry['query']}\n\n")
-                f.write(
-                    f"Date: {datetime.fromisoformat(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')}\n"
-                )
-                f.write(f"Context Set: {entry['set_name']}\n")
-                f.write(f"Model: {entry['model_name']}\n")
-                f.write(f"Files: {entry['files_count']}\n")
-                f.write(f"Tokens: {entry['token_count']}\n\n")
-                f.write(f"Response:\n\n{entry['response']}")
+                f.write(template.format_map(dict(entry, date=date_str)))
 
         return True
     except Exception as e:
@@ -223,16 +423,12 @@ def display_history_list(max_entries: int = 5) -> None:
         except:
             date_str = entry.get("timestamp", "Unknown")
 
-        # Truncate query for preview
-        query = entry.get("query", "")
-        query_preview = (query[:40] + "...") if len(query) > 40 else query
-
         table.add_row(
             entry.get("id", ""),
             date_str,
             entry.get("set_name", ""),
             entry.get("model_name", ""),
-            query_preview,
+            entry.get("query_preview", ""),
         )
 
     console.print("\n[bold]Recent Queries:[/bold]")
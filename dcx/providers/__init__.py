@@ -1,29 +1,76 @@
 """Providers for different LLM services."""
 
-from typing import Dict, Any, Optional
-from rich.console import Console
+import importlib
+import importlib.util
+from typing import Dict, Any, Optional, Type
+from ..console import console
 
-# Import availability flags at the module level so they can be patched in tests
-try:
-    import openai
+# Availability flags live at the module level so they can be patched in tests.
+# They are found without importing the SDKs, which are slow to import and are
+# only needed once a provider is actually used.
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
 
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
 
-try:
-    import anthropic
+def is_openai_available() -> bool:
+    """Check whether the openai package, used by OpenAI and Gemini, is installed."""
+    return OPENAI_AVAILABLE
+
+
+def is_anthropic_available() -> bool:
+    """Check whether the anthropic package is installed."""
+    return ANTHROPIC_AVAILABLE
 
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
 
 from .base import LLMProvider
-from .openai import OpenAIProvider
-from .anthropic import AnthropicProvider
-from .gemini import GeminiProvider
 
-console = Console()
+# Provider name -> (module, class name, availability check, display name, package).
+# Provider modules are imported on first use, and availability is checked
+# through the accessors above, so patching a flag here is seen everywhere.
+_PROVIDERS = {
+    "openai": (
+        ".openai",
+        "OpenAIProvider",
+        is_openai_available,
+        "OpenAI",
+        "openai",
+    ),
+    "anthropic": (
+        ".anthropic",
+        "AnthropicProvider",
+        is_anthropic_available,
+        "Anthropic",
+        "anthropic",
+    ),
+    "gemini": (
+        ".gemini",
+        "GeminiProvider",
+        is_openai_available,
+        "Gemini",
+        "openai",
+    ),
+}
+
+# Provider classes that have already been imported, by provider name
+_provider_classes: Dict[str, Type[LLMProvider]] = {}
+
+
+def _load_provider_class(provider_name: str) -> Type[LLMProvider]:
+    """Import a provider's module and return its class, caching the result."""
+    provider_class = _provider_classes.get(provider_name)
+    if provider_class is None:
+        module_name, class_name = _PROVIDERS[provider_name][:2]
+        module = importlib.import_module(module_name, __name__)
+        provider_class = _provider_classes[provider_name] = getattr(module, class_name)
+    return provider_class
+
+
+def __getattr__(name: str) -> Any:
+    """Import provider classes lazily when accessed as package attributes."""
+    for provider_name, entry in _PROVIDERS.items():
+        if entry[1] == name:
+            return _load_provider_class(provider_name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_provider(name: str, config: Dict[str, Any]) -> Optional[LLMProvider]:
@@ -39,32 +86,16 @@ def get_provider(name: str, config: Dict[str, Any]) -> Optional[LLMProvider]:
     """
     provider_name = config.get("provider", "").lower()
 
-    if provider_name == "openai":
-        if not OPENAI_AVAILABLE:
-            console.print(
-                "[yellow]Warning:[/yellow] OpenAI provider requested but the openai "
-                "package is not installed. Install it with: [bold]pip install dot-context[openai][/bold]"
-            )
-            return None
-        return OpenAIProvider(config)
-
-    elif provider_name == "anthropic":
-        if not ANTHROPIC_AVAILABLE:
-            console.print(
-                "[yellow]Warning:[/yellow] Anthropic provider requested but the anthropic "
-                "package is not installed. Install it with: [bold]pip install dot-context[anthropic][/bold]"
-            )
-            return None
-        return AnthropicProvider(config)
-
-    elif provider_name == "gemini":
-        if not OPENAI_AVAILABLE:
-            console.print(
-                "[yellow]Warning:[/yellow] Gemini provider requested but the openai "
-                "package is not installed. Install it with: [bold]pip install dot-context[openai][/bold]"
-            )
-            return None
-        return GeminiProvider(config)
-
-    console.print(f"[red]Error:[/red] Unsupported provider: {provider_name}")
-    return None
+    entry = _PROVIDERS.get(provider_name)
+    if entry is None:
+        console.print(f"[red]Error:[/red] Unsupported provider: {provider_name}")
+        return None
+
+    _, _, is_available, display_name, package = entry
+    if not is_available():
+        console.print(
+            f"[yellow]Warning:[/yellow] {display_name} provider requested but the {package} "
+            f"package is not installed. Install it with: [bold]pip install dot-context[{package}][/bold]"
+        )
+        return None
+    return _load_provider_class(provider_name)(config)
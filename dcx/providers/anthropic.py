@@ -1,17 +1,29 @@
 """Anthropic provider implementation."""
 
+import functools
 import os
-from typing import Dict, Any, Optional, Iterator, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, Iterator, List
 
-from . import ANTHROPIC_AVAILABLE
+from . import is_anthropic_available
 
-if ANTHROPIC_AVAILABLE:
+if TYPE_CHECKING:
     from anthropic import Anthropic
 
 from .base import LLMProvider
-from rich.console import Console
+from ..console import console
 
-console = Console()
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str) -> "Anthropic":
+    """
+    Get a shared Anthropic client for an API key.
+
+    The client keeps its HTTP connections alive, so sharing it between
+    provider instances avoids a new TLS handshake for back-to-back requests.
+    """
+    from anthropic import Anthropic
+
+    return Anthropic(api_key=api_key)
 
 
 class AnthropicProvider(LLMProvider):
@@ -24,9 +36,9 @@ class AnthropicProvider(LLMProvider):
         self.api_key = config.get("api-key")
         self.client = None
 
-        if ANTHROPIC_AVAILABLE and self.api_key:
+        if is_anthropic_available() and self.api_key:
             try:
-                self.client = Anthropic(api_key=self.api_key)
+                self.client = _get_client(self.api_key)
             except Exception as e:
                 console.print(
                     f"[red]Error initializing Anthropic client:[/red] {str(e)}"
@@ -34,7 +46,7 @@ class AnthropicProvider(LLMProvider):
 
     def validate_config(self) -> bool:
         """Validate the provider configuration."""
-        if not ANTHROPIC_AVAILABLE:
+        if not is_anthropic_available():
             console.print(
                 "[red]Error:[/red] Anthropic Python package not installed. "
                 "Install it with: [bold]pip install anthropic[/bold]"
@@ -3,6 +3,9 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional, Iterator
 
+# Seconds to wait for the request made by LLMProvider.warm_up
+WARM_UP_TIMEOUT = 5.0
+
 
 class LLMProvider(ABC):
     """Base class for LLM providers."""
@@ -27,6 +30,23 @@ class LLMProvider(ABC):
         """
         pass
 
+    def warm_up(self) -> None:
+        """
+        Open a connection to the provider ahead of the first request.
+
+        Called on a background thread while the prompt is being built, so it
+        must not raise or print. The default makes a cheap request to list
+        models through ``self.client``, which the OpenAI and Anthropic SDK
+        clients both support; the connection then stays in the client's pool.
+        """
+        client = getattr(self, "client", None)
+        if client is None:
+            return
+        try:
+            client.with_options(timeout=WARM_UP_TIMEOUT, max_retries=0).models.list()
+        except Exception:
+            pass
+
     @abstractmethod
     def get_completion(
         self,
@@ -1,25 +1,30 @@
 """Gemini provider implementation using OpenAI compatibility layer."""
 
+import functools
 import os
-from typing import Dict, Any, Optional, Iterator, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, Iterator, List
 
 # We'll use the OpenAI client for Gemini through its compatibility mode
-# Use the module-level OPENAI_AVAILABLE from __init__.py
-from . import OPENAI_AVAILABLE
+from . import is_openai_available
 
-# Only import OpenAI if the package is available
-if OPENAI_AVAILABLE:
+if TYPE_CHECKING:
     from openai import OpenAI
 
 from .base import LLMProvider
-from rich.console import Console
-
-console = Console()
+from ..console import console
 
 # Gemini API base URL for OpenAI compatibility
 GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
 
 
+@functools.lru_cache(maxsize=8)
+def _get_client(api_key: str) -> "OpenAI":
+    """Get the shared client for Gemini's OpenAI-compatible endpoint."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key, base_url=GEMINI_BASE_URL)
+
+
 class GeminiProvider(LLMProvider):
     """Gemini API provider using OpenAI compatibility."""
 
@@ -36,9 +41,9 @@ class GeminiProvider(LLMProvider):
         self.client = None
 
         # Initialize client if OpenAI is available
-        if OPENAI_AVAILABLE and self.api_key:
+        if is_openai_available() and self.api_key:
             try:
-                self.client = OpenAI(api_key=self.api_key, base_url=GEMINI_BASE_URL)
+                self.client = _get_client(self.api_key)
             except Exception as e:
                 console.print(f"[red]Error initializing Gemini client:[/red] {str(e)}")
 
@@ -49,7 +54,7 @@ class GeminiProvider(LLMProvider):
         Returns:
             True if configuration is valid, False otherwise
         """
-        if not OPENAI_AVAILABLE:
+        if not is_openai_available():
             console.print(
                 "[red]Error:[/red] OpenAI Python package not installed. "
                 "Install it with: [bold]pip install openai[/bold]"
@@ -75,8 +80,9 @@ class GeminiProvider(LLMProvider):
 
         return True
 
+    @staticmethod
     def _create_messages(
-        self, prompt: str, system_prompt: Optional[str] = None
+        prompt: str, system_prompt: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """
         Create the messages for the Gemini API.
@@ -1,19 +1,24 @@
 """OpenAI provider implementation."""
 
+import functools
 import os
-from typing import Dict, Any, Optional, Iterator, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, Iterator, List
 
-# Use the module-level OPENAI_AVAILABLE from __init__.py
-from . import OPENAI_AVAILABLE
+from . import is_openai_available
 
-# Only import OpenAI if the package is available
-if OPENAI_AVAILABLE:
+if TYPE_CHECKING:
     from openai import OpenAI
 
 from .base import LLMProvider
-from rich.console import Console
+from ..console import console
 
-console = Console()
+
+@functools.lru_cache(maxsize=8)
+def _get_client(api_key: str) -> "OpenAI":
+    """Get the OpenAI client for an API key, shared so its connection pool is reused."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
 
 
 class OpenAIProvider(LLMProvider):
@@ -37,9 +42,9 @@ class OpenAIProvider(LLMProvider):
         self.client = None
 
         # Initialize client if OpenAI is available
-        if OPENAI_AVAILABLE and self.api_key:
+        if is_openai_available() and self.api_key:
             try:
-                self.client = OpenAI(api_key=self.api_key)
+                self.client = _get_client(self.api_key)
             except Exception as e:
                 console.print(f"[red]Error initializing OpenAI client:[/red] {str(e)}")
 
@@ -50,7 +55,7 @@ class OpenAIProvider(LLMProvider):
         Returns:
             True if configuration is valid, False otherwise
         """
-        if not OPENAI_AVAILABLE:
+        if not is_openai_available():
             console.print(
                 "[red]Error:[/red] OpenAI Python package not installed. "
                 "Install it with: [bold]pip install openai[/bold]"
@@ -76,8 +81,9 @@ class OpenAIProvider(LLMProvider):
 
         return True
 
+    @staticmethod
     def _create_messages(
-        self, prompt: str, system_prompt: Optional[str] = None
+        prompt: str, system_prompt: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """
         Create the messages for the OpenAI API.
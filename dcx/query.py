@@ -1,55 +1,111 @@
 """Query handling for dot-context."""
 
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Tuple
 
-from rich.console import Console
+from .console import console
 from rich.markdown import Markdown
 from rich.live import Live
 import time
 from .history import save_query_to_history
 
 from .config import load_config
-from .context_sets import get_context_set_files, load_context_sets
-from .providers import get_provider
-from .utils.tokens import count_tokens_in_file, format_token_count
-
-console = Console()
+from .context_sets import get_context_set_files
+from .providers import LLMProvider, get_provider
+from .utils.response_cache import (
+    DEFAULT_RESPONSE_TTL,
+    DEFAULT_SIMILARITY,
+    SEMANTIC_CACHE_AVAILABLE,
+    add_semantic_response,
+    embed_query,
+    get_cached_response,
+    get_similar_response,
+    make_response_key,
+    set_cached_response,
+)
+from .utils.tokens import format_token_count, read_file_with_tokens
+
+# Maximum number of threads used to read context files
+MAX_READ_WORKERS = 32
+
+# Filename headers added by format_context_from_files
+_FILENAME_HEADER_RE = re.compile(r"# .*?\n\n")
+
+# Number of models queried at once by a batch query, unless DCX_CONCURRENCY
+# says otherwise
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# Instructions placed before the context in every prompt
+PROMPT_PREAMBLE = (
+    "Please respond to my question based on the following context from my "
+    "project files."
+)
+
+# Minimum seconds between re-renders of a streaming response, matching the
+# Live display's refresh rate
+STREAM_UPDATE_INTERVAL = 0.1
+
+
+def _read_context_file(file_path: Path) -> Optional[Tuple[str, int]]:
+    """Read a context file and count its tokens, or return None on error."""
+    try:
+        return read_file_with_tokens(file_path)
+    except Exception as e:
+        console.print(f"[red]Error reading file {file_path}:[/red] {str(e)}")
+        return None
 
 
-def format_context_from_files(files: List[Path]) -> Tuple[str, int]:
+def format_context_from_files(
+    files: List[Path], include_filenames: bool = True
+) -> Tuple[str, int]:
     """
     Format a list of files into a context string.
 
+    Files are read concurrently, each exactly once, and appear in the
+    context in the order given.
+
     Args:
         files: List of file paths to include in the context
+        include_filenames: Whether to put a filename header before each file
 
     Returns:
         Tuple of (formatted context string, total token count)
     """
-    context_parts = []
+    if not files:
+        return "", 0
+
+    # The context is assembled from its pieces with a single join, so each
+    # file's content is copied only once, into the final string
+    context_parts: List[str] = []
     total_tokens = 0
 
-    for file_path in files:
-        try:
-            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                content = f.read()
+    # Resolved once, rather than by os.path.relpath for every file
+    cwd = os.getcwd()
+
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(files))) as executor:
+        for file_path, result in zip(files, executor.map(_read_context_file, files)):
+            if result is None:
+                continue
+            content, tokens = result
+            total_tokens += tokens
 
-            # Get relative path for display
-            rel_path = Path(os.path.relpath(file_path))
-            file_info = count_tokens_in_file(file_path)
-            total_tokens += file_info["tokens"]
+            # Sections are separated by a blank line
+            if context_parts:
+                context_parts.append("\n")
 
-            # Format file content with header
-            file_header = f"# {rel_path}\n\n"
-            file_section = f"{file_header}{content}\n\n"
+            if include_filenames:
+                # Get relative path for display
+                rel_path = os.path.relpath(file_path, cwd)
 
-            context_parts.append(file_section)
-        except Exception as e:
-            console.print(f"[red]Error reading file {file_path}:[/red] {str(e)}")
+                # Format file content with header
+                context_parts.extend(("# ", rel_path, "\n\n"))
+            context_parts.extend((content, "\n\n"))
 
-    return "\n".join(context_parts), total_tokens
+    return "".join(context_parts), total_tokens
 
 
 def create_prompt(context: str, query: str, include_filenames: bool = True) -> str:
@@ -59,37 +115,40 @@ def create_prompt(context: str, query: str, include_filenames: bool = True) -> s
     Args:
         context: The context text from files
         query: The user's query
-        include_filenames: Whether to include filenames in context
+        include_filenames: Whether to keep filename headers in the context.
+            Prefer building the context without them, see
+            format_context_from_files; stripping them here is a fallback for
+            already formatted context.
 
     Returns:
         Formatted prompt string
     """
-    # Simple prompt format, can be enhanced later
-    if include_filenames:
-        prompt = f"Below is the context from my project files:\n\n{context}\n\nMy question is: {query}\n\nPlease respond to my question based on the provided context."
-    else:
-        # Strip out the filename headers if not wanted
-        # This is a very simple implementation and could be improved
-        import re
+    if not include_filenames:
+        context = _FILENAME_HEADER_RE.sub("", context)
 
-        context_without_headers = re.sub(r"# .*?\n\n", "", context)
-        prompt = f"Below is the context from my project:\n\n{context_without_headers}\n\nMy question is: {query}\n\nPlease respond to my question based on the provided context."
+    # The instructions and context come first and the query last, so prompts
+    # for the same context share a long identical prefix that providers can
+    # reuse through prompt caching
+    prompt = f"{PROMPT_PREAMBLE}\n\n{context}\n\n---\nMy question is: {query}"
 
     return prompt
 
 
 def format_context_from_multiple_sets(
-    set_names: List[str], config_path: Optional[Path] = None
-) -> Tuple[str, int]:
+    set_names: List[str],
+    config_path: Optional[Path] = None,
+    include_filenames: bool = True,
+) -> Tuple[str, int, int]:
     """
     Format context from multiple context sets.
 
     Args:
         set_names: List of set names to include
         config_path: Path to the .context file
+        include_filenames: Whether to put a filename header before each file
 
     Returns:
-        Tuple of (formatted context string, total token count)
+        Tuple of (formatted context string, total token count, number of files)
     """
     all_files = []
     for set_name in set_names:
@@ -102,14 +161,92 @@ def format_context_from_multiple_sets(
             )
 
     # Remove duplicates while preserving order
-    unique_files = []
-    seen = set()
-    for file in all_files:
-        if file not in seen:
-            seen.add(file)
-            unique_files.append(file)
+    unique_files = list(dict.fromkeys(all_files))
+
+    context, total_tokens = format_context_from_files(unique_files, include_filenames)
+    return context, total_tokens, len(unique_files)
+
+
+def _build_context(
+    set_name: str,
+    config_path: Optional[Path],
+    include_filenames: bool,
+    interactive: bool = True,
+) -> Optional[Tuple[str, int, int, str]]:
+    """
+    Build the context for a query from one or more comma-separated sets.
+
+    When ``interactive`` is False an empty set cancels the query instead of
+    asking whether to proceed.
+
+    Returns:
+        Tuple of (context, total token count, number of files, set display
+        name), or None if the query should not go ahead
+    """
+    # Check if we have multiple sets (comma-separated)
+    set_names = [s.strip() for s in set_name.split(",")]
+
+    if len(set_names) > 1:
+        # Multiple sets specified
+        context, total_tokens, files_count = format_context_from_multiple_sets(
+            set_names, config_path, include_filenames
+        )
+        set_display = ", ".join(set_names)
+    else:
+        # Single set specified
+        try:
+            files = get_context_set_files(set_name, config_path)
+            files_count = len(files)
+        except KeyError:
+            console.print(f"[red]Error:[/red] Context set '{set_name}' not found")
+            return None
+
+        if not files:
+            console.print(
+                f"[yellow]Warning:[/yellow] No files found in context set '{set_name}'"
+            )
+            if not interactive:
+                console.print("Query cancelled: the context is empty.")
+                return None
+            proceed = console.input(
+                "Do you want to proceed with an empty context? [y/N]: "
+            ).lower()
+            if proceed != "y":
+                console.print("Query cancelled.")
+                return None
+            context = ""
+            total_tokens = 0
+        else:
+            context, total_tokens = format_context_from_files(files, include_filenames)
+
+        set_display = set_name
 
-    return format_context_from_files(unique_files)
+    return context, total_tokens, files_count, set_display
+
+
+def _print_query_header(
+    set_display: str,
+    files_count: int,
+    total_tokens: int,
+    model_label: str,
+    models: str,
+    query: str,
+) -> None:
+    """Print the context, model(s) and query before running a query."""
+    console.print(
+        f"\n[bold]Context:[/bold] {set_display} "
+        f"({files_count} files, ~{format_token_count(total_tokens)} tokens)"
+    )
+    console.print(f"[bold]{model_label}:[/bold] {models}")
+    console.print(f"[bold]Query:[/bold] {query}\n")
+
+
+def _start_warm_up(provider: LLMProvider) -> None:
+    """
+    Open the connection to a provider on a background thread, so the TLS
+    handshake is out of the way before the first request.
+    """
+    threading.Thread(target=provider.warm_up, daemon=True).start()
 
 
 def execute_query(
@@ -123,6 +260,7 @@ def execute_query(
     include_filenames: bool = True,
     config_path: Optional[Path] = None,
     save_history: bool = True,
+    interactive: bool = True,
 ) -> None:
     """
     Execute a query against a model with given context.
@@ -137,6 +275,8 @@ def execute_query(
         stream: Whether to stream the response
         include_filenames: Whether to include filenames in context
         config_path: Path to config file
+        save_history: Whether to save the response to history
+        interactive: Whether to ask before querying with an empty context
     """
     try:
         # Load config and files
@@ -154,46 +294,6 @@ def execute_query(
 
         model_config = config["Models"][model_name]
 
-        # Check if we have multiple sets (comma-separated)
-        set_names = [s.strip() for s in set_name.split(",")]
-
-        if len(set_names) > 1:
-            # Multiple sets specified
-            context, total_tokens = format_context_from_multiple_sets(
-                set_names, config_path
-            )
-            files_count = sum(
-                len(get_context_set_files(s, config_path))
-                for s in set_names
-                if s in load_context_sets(config_path)
-            )
-            set_display = ", ".join(set_names)
-        else:
-            # Single set specified
-            try:
-                files = get_context_set_files(set_name, config_path)
-                files_count = len(files)
-            except KeyError:
-                console.print(f"[red]Error:[/red] Context set '{set_name}' not found")
-                return
-
-            if not files:
-                console.print(
-                    f"[yellow]Warning:[/yellow] No files found in context set '{set_name}'"
-                )
-                proceed = console.input(
-                    "Do you want to proceed with an empty context? [y/N]: "
-                ).lower()
-                if proceed != "y":
-                    console.print("Query cancelled.")
-                    return
-                context = ""
-                total_tokens = 0
-            else:
-                context, total_tokens = format_context_from_files(files)
-
-            set_display = set_name
-
         # Get the provider
         provider = get_provider(model_name, model_config)
         if not provider:
@@ -205,20 +305,92 @@ def execute_query(
         if not provider.validate_config():
             return
 
-        # Create prompt
-        prompt = create_prompt(context, query, include_filenames)
+        # Deterministic queries can be answered from the response cache, either
+        # for an identical prompt or, optionally, for a paraphrased query
+        cache_settings = config.get("Cache") or {}
+        use_cache = bool(cache_settings.get("enabled")) and temperature == 0
+        cache_ttl = cache_settings.get("ttl", DEFAULT_RESPONSE_TTL)
 
-        # Display query information
-        console.print(
-            f"\n[bold]Context:[/bold] {set_display} ({files_count} files, ~{format_token_count(total_tokens)} tokens)"
+        # Without the cache the provider is always called, so its connection
+        # is opened while the context is built
+        if not use_cache:
+            _start_warm_up(provider)
+
+        built_context = _build_context(
+            set_name, config_path, include_filenames, interactive
         )
-        console.print(
-            f"[bold]Model:[/bold] {model_name} ({model_config.get('provider', 'unknown')})"
+        if built_context is None:
+            return
+        context, total_tokens, files_count, set_display = built_context
+
+        # Create prompt; filename headers were already left out of the
+        # context if not wanted, so there is nothing to strip
+        prompt = create_prompt(context, query)
+
+        # Display query information
+        provider_name = model_config.get("provider", "unknown")
+        _print_query_header(
+            set_display,
+            files_count,
+            total_tokens,
+            "Model",
+            f"{model_name} ({provider_name})",
+            query,
         )
-        console.print(f"[bold]Query:[/bold] {query}\n")
+
+        cached_response = None
+        query_vec = None
+        if use_cache:
+            cache_params = (
+                model_config.get("provider", ""),
+                model_config.get("model", ""),
+            )
+            cache_key = make_response_key(
+                *cache_params, prompt, system_prompt, temperature, max_tokens
+            )
+            cached_response = get_cached_response(cache_key, cache_ttl)
+            if cached_response is None:
+                # Warm up only on a miss, so exact hits make no request
+                _start_warm_up(provider)
+
+            if cached_response is None and cache_settings.get("semantic"):
+                if SEMANTIC_CACHE_AVAILABLE:
+                    # Paraphrases only match queries against the same context
+                    semantic_scope = make_response_key(
+                        *cache_params, context, system_prompt, temperature, max_tokens
+                    )
+                    try:
+                        query_vec = embed_query(query)
+                        cached_response = get_similar_response(
+                            semantic_scope,
+                            query_vec,
+                            cache_settings.get("similarity", DEFAULT_SIMILARITY),
+                            cache_ttl,
+                        )
+                    except Exception as e:
+                        # The embedding model is downloaded on first use, which
+                        # can fail; the query still goes ahead without it
+                        console.print(
+                            f"[yellow]Warning:[/yellow] Semantic caching failed: {e}"
+                        )
+                        query_vec = None
+                else:
+                    console.print(
+                        "[yellow]Warning:[/yellow] Semantic caching requires the "
+                        "sentence-transformers package. Install it with: "
+                        "[bold]pip install dot-context[semantic][/bold]"
+                    )
+
+        # Providers report failures as an "Error: ..." response or, when
+        # streaming, as a final "Error: ..." chunk after any partial output
+        failed = False
 
         # Display "Thinking..." message and execute query
-        if stream:
+        if cached_response is not None:
+            response_text = cached_response
+            console.print("[bold cyan]Response:[/bold cyan] [dim](cached)[/dim]")
+            console.print(Markdown(response_text))
+        elif stream:
             # First show thinking status
             with console.status("[bold cyan]Thinking...[/bold cyan]"):
                 # Prepare response but don't stream yet
@@ -234,16 +406,28 @@ def execute_query(
 
             # Then show response with streaming
             console.print("[bold cyan]Response:[/bold cyan]")
-            response_text = first_chunk
+
+            # Chunks are collected in a list and joined only when rendering,
+            # rather than growing one string with each chunk
+            chunks = [first_chunk]
 
             # Use Live display for streaming (after the status context is closed)
             with Live(console=console, refresh_per_second=10) as live:
-                live.update(Markdown(response_text))
+                live.update(Markdown(first_chunk))
+                last_update = time.monotonic()
 
-                # Continue with the rest of the stream
+                # Continue with the rest of the stream, re-rendering the
+                # Markdown at most once per refresh instead of per chunk
                 for chunk in stream_iterator:
-                    response_text += chunk
-                    live.update(Markdown(response_text))
+                    chunks.append(chunk)
+                    now = time.monotonic()
+                    if now - last_update >= STREAM_UPDATE_INTERVAL:
+                        live.update(Markdown("".join(chunks)))
+                        last_update = now
+
+                response_text = "".join(chunks)
+                live.update(Markdown(response_text))
+            failed = chunks[-1].startswith("Error:")
         else:
             # Non-streaming mode
             with console.status("[bold cyan]Thinking...[/bold cyan]"):
@@ -253,6 +437,15 @@ def execute_query(
 
             console.print("[bold cyan]Response:[/bold cyan]")
             console.print(Markdown(response_text))
+            failed = response_text.startswith("Error:")
+
+        # Failed or partial responses are not cached
+        if use_cache and cached_response is None and not failed:
+            set_cached_response(cache_key, response_text, cache_ttl)
+            if query_vec is not None:
+                add_semantic_response(
+                    semantic_scope, query_vec, response_text, cache_ttl
+                )
 
         # Save to history if requested
         execution_time = time.time() - start_time
@@ -272,3 +465,125 @@ def execute_query(
 
     except Exception as e:
         console.print(f"[red]Error executing query:[/red] {str(e)}")
+
+
+def get_batch_concurrency() -> int:
+    """Get the maximum number of models queried at once by a batch query."""
+    try:
+        return max(1, int(os.environ.get("DCX_CONCURRENCY", "")))
+    except ValueError:
+        return DEFAULT_BATCH_CONCURRENCY
+
+
+def execute_query_batch(
+    query: str,
+    set_name: str,
+    model_names: List[str],
+    system_prompt: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+    include_filenames: bool = True,
+    config_path: Optional[Path] = None,
+    save_history: bool = True,
+    interactive: bool = True,
+) -> None:
+    """
+    Execute a query against several models at once with the same context.
+
+    The context is built once and the models are queried concurrently, at
+    most DCX_CONCURRENCY (default 4) at a time. Responses are shown in the
+    order the models were given, and each is saved to history separately.
+
+    Args:
+        query: The query to send to the models
+        set_name: Name of the context set to use (can be comma-separated for
+            multiple sets)
+        model_names: Names of the models to use
+        system_prompt: Optional system instructions
+        temperature: Model temperature (0.0 to 1.0)
+        max_tokens: Maximum tokens to generate
+        include_filenames: Whether to include filenames in context
+        config_path: Path to config file
+        save_history: Whether to save each response to history
+        interactive: Whether to ask before querying with an empty context
+    """
+    try:
+        config = load_config(config_path)
+        models = config.get("Models") or {}
+
+        # Validate every model before building the context
+        for model_name in model_names:
+            if model_name not in models:
+                console.print(
+                    f"[red]Error:[/red] Model '{model_name}' not found in configuration"
+                )
+                return
+
+        built_context = _build_context(
+            set_name, config_path, include_filenames, interactive
+        )
+        if built_context is None:
+            return
+        context, total_tokens, files_count, set_display = built_context
+
+        providers = {}
+        for model_name in model_names:
+            provider = get_provider(model_name, models[model_name])
+            if not provider:
+                console.print(
+                    "[red]Error:[/red] Unable to initialize provider for "
+                    f"'{model_name}'"
+                )
+                return
+            if not provider.validate_config():
+                return
+            providers[model_name] = provider
+
+        prompt = create_prompt(context, query)
+
+        # Display query information
+        _print_query_header(
+            set_display,
+            files_count,
+            total_tokens,
+            "Models",
+            ", ".join(model_names),
+            query,
+        )
+
+        def complete(model_name: str) -> Tuple[str, float]:
+            start_time = time.time()
+            response_text = providers[model_name].get_completion(
+                prompt, system_prompt, temperature, max_tokens
+            )
+            return response_text, time.time() - start_time
+
+        with console.status(
+            f"[bold cyan]Thinking ({len(model_names)} models)...[/bold cyan]"
+        ):
+            with ThreadPoolExecutor(
+                max_workers=min(get_batch_concurrency(), len(model_names))
+            ) as executor:
+                results = list(executor.map(complete, model_names))
+
+        for model_name, (response_text, execution_time) in zip(model_names, results):
+            console.print(f"\n[bold cyan]Response from {model_name}:[/bold cyan]")
+            console.print(Markdown(response_text))
+
+            if save_history:
+                history_id = save_query_to_history(
+                    query=query,
+                    response=response_text,
+                    set_name=set_display,
+                    model_name=model_name,
+                    files_count=files_count,
+                    token_count=total_tokens,
+                    execution_time=execution_time,
+                )
+                console.print(
+                    f"[dim]Query saved to history with ID: {history_id}[/dim]"
+                )
+        console.print("\n[dim]Query complete.[/dim]")
+
+    except Exception as e:
+        console.print(f"[red]Error executing query:[/red] {str(e)}")
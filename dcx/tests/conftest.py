@@ -23,6 +23,39 @@ def cleanup_env_vars():
     os.environ.update(original_environ)
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """
+    Fixture to keep the persistent caches out of the user's home directory.
+    This runs automatically for all tests.
+    """
+    cache_dir = tmp_path / "dcx-cache"
+    monkeypatch.setenv("DCX_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def isolated_history_dir(tmp_path, monkeypatch):
+    """
+    Fixture to keep query history written by tests out of the user's home directory.
+    This runs automatically for all tests.
+    """
+    history_dir = tmp_path / "dcx-history"
+    monkeypatch.setenv("DCX_HISTORY_DIR", str(history_dir))
+    return history_dir
+
+
+@pytest.fixture(autouse=True)
+def isolated_socket_path(tmp_path, monkeypatch):
+    """
+    Fixture to keep queries in tests from reaching a running `dcx serve`.
+    This runs automatically for all tests.
+    """
+    socket_path = tmp_path / "dcx.sock"
+    monkeypatch.setenv("DCX_SOCKET", str(socket_path))
+    return socket_path
+
+
 @pytest.fixture
 def example_context_file():
     """Create a simple example .context file for testing."""
@@ -3,7 +3,7 @@
 import os
 import pytest
 from pathlib import Path
-from typer.testing import CliRunner
+from click.testing import CliRunner
 
 from dcx.cli import app
 from dcx import __version__
@@ -82,6 +82,18 @@ def test_init_command_file_exists(runner, tmp_path):
         assert "Sets:" in content
 
 
+def test_init_command_force(runner, tmp_path):
+    """Test the init command overwrites without prompting when forced."""
+    config_path = tmp_path / ".context"
+    config_path.write_text("# Existing config", encoding="utf-8")
+
+    result = runner.invoke(app, ["init", "--path", str(tmp_path), "--force"])
+    assert result.exit_code == 0
+    assert "already exists" not in result.stdout
+    assert "Successfully created" in result.stdout
+    assert "Sets:" in config_path.read_text(encoding="utf-8")
+
+
 def test_config_command_no_file(runner, tmp_path):
     """Test the config command when no file exists."""
     with runner.isolated_filesystem(temp_dir=tmp_path):
@@ -114,3 +126,48 @@ def test_sets_show_nonexistent_set(runner, example_context_file):
     assert result.exit_code == 0
     assert "Error" in result.stdout
     assert "not found" in result.stdout
+
+
+def test_sets_show_command(runner, tmp_path):
+    """Test showing the files in a context set."""
+    (tmp_path / "a.md").write_text("hello world", encoding="utf-8")
+    (tmp_path / "b.md").write_text("one, two, three.", encoding="utf-8")
+    config_path = tmp_path / ".context"
+    config_path.write_text(
+        'Sets:\n  docs:\n    match:\n      - "*.md"\n', encoding="utf-8"
+    )
+
+    result = runner.invoke(app, ["sets", "show", "docs", "--file", str(config_path)])
+    assert result.exit_code == 0
+    assert "Total: 2 files, 27 bytes, 8 estimated tokens" in result.stdout
+
+
+def test_sets_show_command_estimate(runner, tmp_path):
+    """Test estimating token counts from file sizes."""
+    (tmp_path / "a.md").write_text("abcdefghijkl", encoding="utf-8")
+    config_path = tmp_path / ".context"
+    config_path.write_text(
+        'Sets:\n  docs:\n    match:\n      - "*.md"\n', encoding="utf-8"
+    )
+
+    result = runner.invoke(
+        app, ["sets", "show", "docs", "--estimate", "--file", str(config_path)]
+    )
+    assert result.exit_code == 0
+    assert "Total: 1 files, 12 bytes, 4 estimated tokens" in result.stdout
+
+
+@pytest.mark.parametrize(
+    "args, argument_help",
+    [
+        (["sets", "show"], "SET_NAME: Name of the context set to show"),
+        (["history"], "ENTRY_ID: ID of the history entry to view"),
+        (["query"], "QUERY_TEXT: The query text to send to the LLM"),
+    ],
+    ids=["sets-show", "history", "query"],
+)
+def test_argument_help(runner, args, argument_help):
+    """Test that positional arguments are described in the command help."""
+    result = runner.invoke(app, args + ["--help"])
+    assert result.exit_code == 0
+    assert argument_help in result.stdout
@@ -2,7 +2,7 @@
 
 import pytest
 from unittest.mock import patch
-from typer.testing import CliRunner
+from click.testing import CliRunner
 
 from dcx.cli import app
 
@@ -13,7 +13,7 @@ def runner():
     return CliRunner()
 
 
-@patch("dcx.cli.execute_query")
+@patch("dcx.query.execute_query")
 def test_query_command(mock_execute_query, runner):
     """Test the query command."""
     result = runner.invoke(
@@ -44,10 +44,11 @@ def test_query_command(mock_execute_query, runner):
         stream=False,
         include_filenames=True,
         config_path=None,
+        save_history=True,
     )
 
 
-@patch("dcx.cli.execute_query")
+@patch("dcx.query.execute_query")
 def test_query_command_with_system_prompt(mock_execute_query, runner):
     """Test the query command with a system prompt."""
     result = runner.invoke(
@@ -76,4 +77,38 @@ def test_query_command_with_system_prompt(mock_execute_query, runner):
         stream=True,  # Default
         include_filenames=False,
         config_path=None,
+        save_history=True,
+    )
+
+
+@patch("dcx.query.execute_query_batch")
+@patch("dcx.query.execute_query")
+def test_query_command_multiple_models(
+    mock_execute_query, mock_execute_query_batch, runner
+):
+    """Test that a comma-separated model list runs a batch query."""
+    result = runner.invoke(
+        app,
+        [
+            "query",
+            "What does this code do?",
+            "--set",
+            "code",
+            "--model",
+            "openai, claude",
+        ],
+    )
+
+    assert result.exit_code == 0
+    mock_execute_query.assert_not_called()
+    mock_execute_query_batch.assert_called_once_with(
+        query="What does this code do?",
+        set_name="code",
+        model_names=["openai", "claude"],
+        system_prompt=None,
+        temperature=0.7,
+        max_tokens=None,
+        include_filenames=True,
+        config_path=None,
+        save_history=True,
     )
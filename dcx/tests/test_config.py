@@ -3,9 +3,16 @@
 import os
 import tempfile
 import pytest
+from datetime import date
 from pathlib import Path
+from unittest.mock import patch
 
-from dcx.config import load_config, _expand_env_vars
+from dcx.config import (
+    _CONFIG_CACHE,
+    _expand_env_vars,
+    find_config_file,
+    load_config,
+)
 
 
 def test_expand_env_vars():
@@ -36,6 +43,15 @@ def test_expand_env_vars():
     assert result[2][0] == "nested_test_value"
 
 
+def test_expand_multiple_env_vars():
+    """Test that every environment variable in a string is expanded."""
+    os.environ["TEST_HOST"] = "example.com"
+    os.environ["TEST_PORT"] = "8080"
+
+    result = _expand_env_vars("https://${TEST_HOST}:${TEST_PORT}/${TEST_MISSING}")
+    assert result == "https://example.com:8080/"
+
+
 @pytest.fixture
 def temp_config_file():
     """Create a temporary configuration file for testing."""
@@ -90,3 +106,88 @@ def test_load_config_file_not_found():
     """Test that FileNotFoundError is raised when config file is not found."""
     with pytest.raises(FileNotFoundError):
         load_config(Path("/path/that/does/not/exist/.context"))
+
+
+def test_load_config_returns_independent_copies(temp_config_file):
+    """Test that cached configs are not shared between callers."""
+    config = load_config(temp_config_file)
+    config["Sets"]["test_set"]["description"] = "Mutated"
+
+    assert load_config(temp_config_file)["Sets"]["test_set"]["description"] == (
+        "Test set"
+    )
+
+
+def test_load_config_reloads_changed_file(temp_config_file):
+    """Test that a modified config file is parsed again."""
+    assert "test_set" in load_config(temp_config_file)["Sets"]
+
+    with open(temp_config_file, "w", encoding="utf-8") as f:
+        f.write('Sets:\n  other_set:\n    match:\n      - "*.py"\n')
+
+    assert list(load_config(temp_config_file)["Sets"]) == ["other_set"]
+
+
+def test_load_config_expands_env_vars(tmp_path):
+    """Test that env vars are expanded on every load, including cache hits."""
+    config_path = tmp_path / ".context"
+    config_path.write_text(
+        "Models:\n  test_model:\n    api-key: ${TEST_API_KEY}\n", encoding="utf-8"
+    )
+
+    os.environ["TEST_API_KEY"] = "first"
+    assert load_config(config_path)["Models"]["test_model"]["api-key"] == "first"
+
+    os.environ["TEST_API_KEY"] = "second"
+    assert load_config(config_path)["Models"]["test_model"]["api-key"] == "second"
+
+
+def test_load_config_persistent_cache(tmp_path, isolated_cache_dir, monkeypatch):
+    """Test that a new process can load an unchanged config without parsing YAML."""
+    config_path = tmp_path / ".context"
+    config_path.write_text(
+        "Models:\n  test_model:\n    api-key: ${TEST_API_KEY}\n", encoding="utf-8"
+    )
+    monkeypatch.setenv("TEST_API_KEY", "cached")
+    load_config(config_path)
+    cache_files = list((isolated_cache_dir / "config").glob("*.json"))
+    assert cache_files
+    # Only the owner can read the cached config, which may contain API keys
+    if os.name == "posix":
+        assert cache_files[0].stat().st_mode & 0o777 == 0o600
+
+    # Simulate a fresh process by dropping the in-process cache
+    with patch.dict(_CONFIG_CACHE, clear=True), patch(
+        "dcx.config._parse_yaml"
+    ) as mock_parse:
+        config = load_config(config_path)
+        mock_parse.assert_not_called()
+
+    assert config["Models"]["test_model"]["api-key"] == "cached"
+
+
+def test_load_config_skips_persisting_yaml_only_types(tmp_path, isolated_cache_dir):
+    """Test that configs JSON can't represent exactly are not persisted."""
+    config_path = tmp_path / ".context"
+    config_path.write_text("Released: 2024-01-01\n1: one\n", encoding="utf-8")
+
+    config = load_config(config_path)
+
+    assert config == {"Released": date(2024, 1, 1), 1: "one"}
+    assert not (isolated_cache_dir / "config").exists()
+
+
+def test_find_config_file(tmp_path):
+    """Test finding the closest .context file from a nested directory."""
+    nested_dir = tmp_path / "a" / "b"
+    nested_dir.mkdir(parents=True)
+
+    assert find_config_file(nested_dir) is None
+
+    config_path = tmp_path / ".context"
+    config_path.write_text("Sets: {}\n", encoding="utf-8")
+    assert find_config_file(nested_dir) == config_path
+
+    # A cached location that has been removed is not returned
+    config_path.unlink()
+    assert find_config_file(nested_dir) is None
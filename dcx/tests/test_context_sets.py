@@ -1,30 +1,11 @@
 """Tests for the context sets functionality."""
 
-import os
-import tempfile
 import pytest
-from pathlib import Path
 
-from dcx.context_sets import ContextSet, load_context_sets
+from dcx.context_sets import ContextSet, _iter_pattern_files, load_context_sets
 
 
-@pytest.fixture
-def test_dir():
-    """Create a temporary directory with test files for testing context sets."""
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        base_dir = Path(tmp_dir)
-
-        # Create some test files
-        create_test_file(base_dir, "file1.md", "Test content 1")
-        create_test_file(base_dir, "file2.md", "Test content 2")
-        create_test_file(base_dir, "subfolder/file3.md", "Test content 3")
-        create_test_file(base_dir, "file4.txt", "Test content 4")
-
-        # Create a test .context file
-        config_path = base_dir / ".context"
-        with open(config_path, "w", encoding="utf-8") as f:
-            f.write(
-                """
+TEST_CONFIG = """
 Sets:
   markdown:
     match:
@@ -56,17 +37,74 @@ Models:
     model: test-model
     description: "Test model"
 """
-            )
 
-        yield {"base_dir": base_dir, "config_path": config_path}
+
+def build_sets(base_dir):
+    """Build the context sets of TEST_CONFIG directly, without parsing YAML."""
+    sets_config = {
+        "markdown": {"match": ["*.md"], "description": "Markdown files"},
+        "subfolder": {"match": ["subfolder/*.md"], "description": "Subfolder files"},
+        "combined": {
+            "include": ["markdown", "subfolder"],
+            "description": "Combined set",
+        },
+        "with_pattern": {
+            "match": ["*.txt"],
+            "include": ["markdown"],
+            "description": "With pattern and include",
+        },
+    }
+    return {
+        name: ContextSet(name, config, base_dir) for name, config in sets_config.items()
+    }
+
+
+def create_test_tree(base_dir):
+    """Create the test files and .context file under base_dir."""
+    (base_dir / "subfolder").mkdir()
+    (base_dir / "file1.md").write_text("Test content 1", encoding="utf-8")
+    (base_dir / "file2.md").write_text("Test content 2", encoding="utf-8")
+    (base_dir / "subfolder" / "file3.md").write_text("Test content 3", encoding="utf-8")
+    (base_dir / "file4.txt").write_text("Test content 4", encoding="utf-8")
+
+    config_path = base_dir / ".context"
+    config_path.write_text(TEST_CONFIG, encoding="utf-8")
+
+    return {"base_dir": base_dir, "config_path": config_path}
+
+
+@pytest.fixture(scope="module")
+def test_dir(tmp_path_factory):
+    """
+    Create a directory with test files for testing context sets.
+
+    The tree is shared by every test in this module, so tests using it
+    must not modify it; use writable_test_dir instead.
+    """
+    return create_test_tree(tmp_path_factory.mktemp("ctx"))
+
+
+@pytest.fixture(scope="module")
+def all_sets(test_dir, tmp_path_factory):
+    """Load the context sets of the shared test tree once per module."""
+    # Module fixtures are set up before the autouse cache fixture, so keep
+    # the persisted config cache out of the user's home directory here too
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DCX_CACHE_DIR", str(tmp_path_factory.mktemp("dcx-cache")))
+        return load_context_sets(test_dir["config_path"])
+
+
+@pytest.fixture
+def writable_test_dir(tmp_path):
+    """Create a private copy of the test tree for tests that modify it."""
+    return create_test_tree(tmp_path)
 
 
 def create_test_file(base_dir, relative_path, content):
     """Create a test file with the given relative path and content."""
     file_path = base_dir / relative_path
-    os.makedirs(file_path.parent, exist_ok=True)
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(content, encoding="utf-8")
 
 
 def test_context_set_direct_match(test_dir):
@@ -76,11 +114,8 @@ def test_context_set_direct_match(test_dir):
     test_set = ContextSet("test", config, base_dir)
 
     files = test_set.get_matching_files()
-    file_names = {f.name for f in files}
 
-    assert len(files) == 2
-    assert "file1.md" in file_names
-    assert "file2.md" in file_names
+    assert [f.name for f in files] == ["file1.md", "file2.md"]
 
 
 def test_context_set_subfolder_match(test_dir):
@@ -89,48 +124,92 @@ def test_context_set_subfolder_match(test_dir):
     config = {"match": ["subfolder/*.md"], "description": "Test set"}
     test_set = ContextSet("test", config, base_dir)
 
+    files = test_set.get_matching_files()
+
+    assert [f.name for f in files] == ["file3.md"]
+
+
+def test_context_set_recursive_match(writable_test_dir):
+    """Test matching files at any depth with a ** pattern."""
+    base_dir = writable_test_dir["base_dir"]
+    create_test_file(base_dir, ".hidden/file5.md", "Hidden content")
+    config = {"match": ["**/*.md"], "description": "Test set"}
+    test_set = ContextSet("test", config, base_dir)
+
     files = test_set.get_matching_files()
     file_names = {f.name for f in files}
 
-    assert len(files) == 1
-    assert "file3.md" in file_names
+    # Hidden directories are skipped, as with glob
+    assert file_names == {"file1.md", "file2.md", "file3.md"}
+
+
+def test_context_set_literal_and_bracket_match(test_dir):
+    """Test matching literal paths and character classes."""
+    base_dir = test_dir["base_dir"]
+    config = {"match": ["file4.txt", "file[12].md", "missing.md"]}
+    test_set = ContextSet("test", config, base_dir)
+
+    files = test_set.get_matching_files()
+
+    assert files == [
+        base_dir / "file1.md",
+        base_dir / "file2.md",
+        base_dir / "file4.txt",
+    ]
 
 
 def test_context_set_include(test_dir):
     """Test including other sets."""
-    config_path = test_dir["config_path"]
-    all_sets = load_context_sets(config_path)
+    all_sets = build_sets(test_dir["base_dir"])
     combined_set = all_sets["combined"]
 
     files = combined_set.get_matching_files(all_sets)
-    file_names = {f.name for f in files}
 
-    assert len(files) == 3
-    assert "file1.md" in file_names
-    assert "file2.md" in file_names
-    assert "file3.md" in file_names
+    assert [f.name for f in files] == ["file1.md", "file2.md", "file3.md"]
 
 
 def test_context_set_with_pattern_and_include(test_dir):
     """Test a set with both pattern and include."""
-    config_path = test_dir["config_path"]
-    all_sets = load_context_sets(config_path)
+    all_sets = build_sets(test_dir["base_dir"])
     set_with_both = all_sets["with_pattern"]
 
     files = set_with_both.get_matching_files(all_sets)
-    file_names = {f.name for f in files}
 
-    assert len(files) == 3
-    assert "file1.md" in file_names
-    assert "file2.md" in file_names
-    assert "file4.txt" in file_names
+    assert [f.name for f in files] == ["file1.md", "file2.md", "file4.txt"]
 
 
-def test_load_context_sets(test_dir):
-    """Test loading all context sets from config."""
-    config_path = test_dir["config_path"]
-    all_sets = load_context_sets(config_path)
+def test_context_set_transitive_circular_include(test_dir):
+    """Test that includes are followed transitively and cycles terminate."""
+    base_dir = test_dir["base_dir"]
+    all_sets = {
+        "a": ContextSet("a", {"match": ["*.txt"], "include": ["b"]}, base_dir),
+        "b": ContextSet("b", {"include": ["c"]}, base_dir),
+        "c": ContextSet("c", {"match": ["*.md"], "include": ["a", "b"]}, base_dir),
+    }
+
+    files = all_sets["a"].get_matching_files(all_sets)
+
+    assert [f.name for f in files] == ["file1.md", "file2.md", "file4.txt"]
+    assert [f.name for f in all_sets["b"].get_matching_files(all_sets)] == [
+        "file1.md",
+        "file2.md",
+        "file4.txt",
+    ]
+
+
+def test_context_set_iter_matching_files(all_sets):
+    """Test streaming matches without duplicates from patterns and includes."""
+    set_with_both = all_sets["with_pattern"]
+
+    files = list(set_with_both.iter_matching_files(all_sets))
+
+    assert len(files) == len(set(files)) == 3
+    assert files[0].name == "file4.txt"
+    assert sorted(files) == set_with_both.get_matching_files(all_sets)
+
 
+def test_load_context_sets(all_sets):
+    """Test loading all context sets from config."""
     assert len(all_sets) == 4
     assert "markdown" in all_sets
     assert "subfolder" in all_sets
@@ -141,6 +220,41 @@ def test_load_context_sets(test_dir):
     assert all_sets["markdown"].description == "Markdown files"
 
 
+def test_load_context_sets_sees_new_files(writable_test_dir):
+    """Test that each load matches against the current filesystem."""
+    config_path = writable_test_dir["config_path"]
+    all_sets = load_context_sets(config_path)
+    files = all_sets["combined"].get_matching_files(all_sets)
+    assert len(files) == 3
+
+    # Matches are memoized per loaded set, so a later load picks up new files
+    create_test_file(writable_test_dir["base_dir"], "file5.md", "Test content 5")
+    reloaded_sets = load_context_sets(config_path)
+    assert reloaded_sets["markdown"] is not all_sets["markdown"]
+    assert len(reloaded_sets["combined"].get_matching_files(reloaded_sets)) == 4
+
+
+def test_included_sets_matched_once_per_load(writable_test_dir, monkeypatch):
+    """Test that a set included by several others is matched once per load."""
+    matched = []
+
+    def counting_iter_pattern_files(base_dir, pattern, listings):
+        matched.append(pattern)
+        return _iter_pattern_files(base_dir, pattern, listings)
+
+    monkeypatch.setattr(
+        "dcx.context_sets._iter_pattern_files", counting_iter_pattern_files
+    )
+
+    for _ in range(2):
+        all_sets = load_context_sets(writable_test_dir["config_path"])
+        for name in ["combined", "with_pattern", "markdown"]:
+            all_sets[name].get_matching_files(all_sets)
+
+    # Each load matches every pattern once, however often it is included
+    assert sorted(matched) == sorted(["*.md", "subfolder/*.md", "*.txt"] * 2)
+
+
 def test_missing_context_set(test_dir):
     """Test that KeyError is raised for a missing context set."""
     config_path = test_dir["config_path"]
@@ -0,0 +1,108 @@
+"""Tests for the query server."""
+
+import os
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from dcx.console import console
+from dcx.context_sets import get_context_set_files
+from dcx.daemon import (
+    DAEMON_AVAILABLE,
+    QueryServer,
+    _QueryHandler,
+    get_socket_path,
+    run_via_daemon,
+)
+
+pytestmark = pytest.mark.skipif(
+    not DAEMON_AVAILABLE, reason="Unix domain sockets are not available"
+)
+
+
+@pytest.fixture
+def server(isolated_socket_path):
+    """Run a query server on the test socket."""
+    query_server = QueryServer(str(isolated_socket_path), _QueryHandler)
+    thread = threading.Thread(target=query_server.serve_forever, daemon=True)
+    thread.start()
+    yield query_server
+    query_server.shutdown()
+    query_server.server_close()
+
+
+def test_get_socket_path(monkeypatch, tmp_path):
+    """Test the socket location overrides."""
+    monkeypatch.delenv("DCX_SOCKET")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert get_socket_path() == tmp_path / "dcx.sock"
+
+
+def test_run_via_daemon_without_server():
+    """Test that queries run in-process when no server is listening."""
+    assert run_via_daemon("execute_query", {}) is False
+
+
+def test_run_via_daemon(server, tmp_path, capsys):
+    """Test that the server runs the query and streams its output back."""
+    calls = []
+
+    def fake_execute_query(**kwargs):
+        calls.append((kwargs, os.getcwd()))
+        console.print("Response from server")
+
+    with patch("dcx.query.execute_query", side_effect=fake_execute_query):
+        handled = run_via_daemon(
+            "execute_query",
+            {"query": "What?", "config_path": Path("config.context")},
+        )
+
+    assert handled is True
+    assert "Response from server" in capsys.readouterr().out
+
+    # Paths are sent absolute, the server never prompts, and the query runs
+    # in the client's directory
+    kwargs, cwd = calls[0]
+    assert kwargs == {
+        "query": "What?",
+        "config_path": Path(os.path.abspath("config.context")),
+        "interactive": False,
+    }
+    assert cwd == os.getcwd()
+
+
+def test_run_via_daemon_unknown_command(server, capsys):
+    """Test that the server rejects functions other than the query functions."""
+    assert run_via_daemon("save_query_to_history", {}) is True
+    assert "invalid request" in capsys.readouterr().out
+
+
+def test_run_via_daemon_reports_errors(server, capsys):
+    """Test that errors raised while running a query are sent to the client."""
+    assert run_via_daemon("execute_query", {"no_such_option": True}) is True
+    out = capsys.readouterr().out
+    assert out.startswith("Error: ")
+    assert "no_such_option" in out
+
+
+def test_run_via_daemon_sees_new_files(server, tmp_path, capsys):
+    """Test that files created while the server runs are matched."""
+    config_path = tmp_path / ".context"
+    config_path.write_text('Sets:\n  docs:\n    match:\n      - "*.md"\n')
+    (tmp_path / "a.md").write_text("A")
+
+    def fake_execute_query(set_name, config_path, **kwargs):
+        files = get_context_set_files(set_name, config_path)
+        console.print(" ".join(f.name for f in files))
+
+    kwargs = {"set_name": "docs", "config_path": config_path}
+    with patch("dcx.query.execute_query", side_effect=fake_execute_query):
+        run_via_daemon("execute_query", kwargs)
+        assert capsys.readouterr().out.split() == ["a.md"]
+
+        (tmp_path / "b.md").write_text("B")
+        (tmp_path / "a.md").unlink()
+        run_via_daemon("execute_query", kwargs)
+        assert capsys.readouterr().out.split() == ["b.md"]
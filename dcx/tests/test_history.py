@@ -0,0 +1,141 @@
+"""Tests for the query history functionality."""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from dcx.history import (
+    get_history_entries,
+    get_history_entry,
+    save_entry_to_file,
+    save_query_to_history,
+)
+
+
+def _save(query="What is this?", response="It is a test."):
+    """Save a history entry with fixed metadata."""
+    return save_query_to_history(
+        query=query,
+        response=response,
+        set_name="code",
+        model_name="test_model",
+        files_count=2,
+        token_count=42,
+        execution_time=1.5,
+    )
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_save_and_get_history_entry(orjson_available):
+    """Test saving an entry and reading it back by ID."""
+    with patch("dcx.history.ORJSON_AVAILABLE", orjson_available):
+        entry_id = _save(response="Ünïcode response")
+        entry = get_history_entry(entry_id)
+
+    assert entry["id"] == entry_id
+    assert entry["query"] == "What is this?"
+    assert entry["response"] == "Ünïcode response"
+    assert entry["set_name"] == "code"
+    assert entry["model_name"] == "test_model"
+    assert entry["files_count"] == 2
+    assert entry["token_count"] == 42
+
+
+def test_get_history_entry_from_log_with_many_entries():
+    """Test looking up older entries in the append-only log."""
+    ids = [_save(query=f"Query {i}") for i in range(5)]
+
+    assert get_history_entry(ids[0])["query"] == "Query 0"
+    assert get_history_entry(ids[3])["query"] == "Query 3"
+
+
+def test_get_history_entry_legacy_file(isolated_history_dir):
+    """Test reading and listing entries stored as individual JSON files."""
+    isolated_history_dir.mkdir(parents=True)
+    legacy_entry = {
+        "id": "legacy01",
+        "timestamp": "2024-01-01T12:00:00",
+        "query": "Old query",
+        "response": "Old response",
+        "set_name": "code",
+        "model_name": "test_model",
+        "files_count": 1,
+        "token_count": 10,
+    }
+    (isolated_history_dir / "legacy01.json").write_text(
+        json.dumps(legacy_entry), encoding="utf-8"
+    )
+
+    assert get_history_entry("legacy01") == legacy_entry
+
+    new_id = _save()
+    entries = get_history_entries()
+    assert [entry["id"] for entry in entries] == [new_id, "legacy01"]
+
+
+def test_get_history_entry_not_found():
+    """Test that a missing entry returns None."""
+    assert get_history_entry("missing") is None
+
+
+def test_get_history_entries_newest_first():
+    """Test that recent entries are listed newest first and limited."""
+    ids = [_save(query=f"Query {i}") for i in range(3)]
+
+    entries = get_history_entries(max_entries=2)
+
+    assert [entry["id"] for entry in entries] == [ids[2], ids[1]]
+
+
+def test_get_history_entries_reads_index_in_blocks():
+    """Test listing when index lines span several backward read blocks."""
+    ids = [_save(query=f"Query {i}") for i in range(5)]
+
+    with patch("dcx.history.TAIL_READ_SIZE", 16):
+        entries = get_history_entries(max_entries=10)
+
+    assert [entry["id"] for entry in entries] == ids[::-1]
+
+
+def test_get_history_entries_query_preview():
+    """Test that listings carry a truncated query preview."""
+    _save(query="x" * 50)
+
+    (entry,) = get_history_entries()
+
+    assert entry["query_preview"] == "x" * 40 + "..."
+
+
+def test_get_history_entries_rebuilds_missing_index(isolated_history_dir):
+    """Test that history saved without an index is still listed."""
+    ids = [_save(query=f"Query {i}") for i in range(2)]
+    (isolated_history_dir / "index.jsonl").unlink()
+
+    entries = get_history_entries()
+
+    assert [entry["id"] for entry in entries] == [ids[1], ids[0]]
+    assert (isolated_history_dir / "index.jsonl").exists()
+    # The index is written through a temporary file that is moved into place
+    assert not list(isolated_history_dir.glob("*.tmp"))
+
+
+def test_save_entry_to_file(tmp_path):
+    """Test exporting an entry as JSON, Markdown and plain text."""
+    entry_id = _save()
+
+    json_path = tmp_path / "entry.json"
+    assert save_entry_to_file(entry_id, json_path)
+    assert json.loads(json_path.read_text(encoding="utf-8"))["id"] == entry_id
+
+    md_path = tmp_path / "entry.md"
+    assert save_entry_to_file(entry_id, md_path)
+    content = md_path.read_text(encoding="utf-8")
+    assert content.startswith("# Query: What is this?")
+    assert content.endswith("It is a test.")
+
+    txt_path = tmp_path / "entry.txt"
+    assert save_entry_to_file(entry_id, txt_path)
+    content = txt_path.read_text(encoding="utf-8")
+    assert content.startswith("Query: What is this?")
+    assert "Tokens: 42" in content
+    assert content.endswith("Response:\n\nIt is a test.")
@@ -1,50 +1,34 @@
 """Tests for LLM providers."""
 
 import os
+import subprocess
+import sys
 import pytest
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 from dcx.providers import get_provider
 from dcx.providers.base import LLMProvider
 from dcx.providers.openai import OpenAIProvider
+from dcx.providers.openai import _get_client as openai_client_cache
 from dcx.providers.anthropic import AnthropicProvider
+from dcx.providers.anthropic import _get_client as anthropic_client_cache
 from dcx.providers.gemini import GeminiProvider, GEMINI_BASE_URL
+from dcx.providers.gemini import _get_client as gemini_client_cache
 
 
-# --- Provider Config Fixtures ---
+# --- Fixtures ---
 
 
-@pytest.fixture
-def mock_openai_config():
-    """Sample OpenAI configuration."""
-    return {
-        "provider": "openai",
-        "api-key": "test-key",
-        "model": "gpt-4",
-        "description": "Test model",
-    }
-
-
-@pytest.fixture
-def mock_anthropic_config():
-    """Sample Anthropic configuration."""
-    return {
-        "provider": "anthropic",
-        "api-key": "test-key",
-        "model": "claude-3-opus-20240229",
-        "description": "Test model",
-    }
-
-
-@pytest.fixture
-def mock_gemini_config():
-    """Sample Gemini configuration."""
-    return {
-        "provider": "gemini",
-        "api-key": "test-key",
-        "model": "gemini-2.0-flash",
-        "description": "Test model",
-    }
+@pytest.fixture(autouse=True)
+def clear_shared_clients():
+    """Don't share provider clients (or client mocks) between tests."""
+    client_caches = [anthropic_client_cache, gemini_client_cache, openai_client_cache]
+    for client_cache in client_caches:
+        client_cache.cache_clear()
+    yield
+    for client_cache in client_caches:
+        client_cache.cache_clear()
 
 
 # --- Provider Parameters ---
@@ -52,24 +36,39 @@ def mock_gemini_config():
 PROVIDER_PARAMS = [
     {
         "name": "openai",
-        "config_fixture": "mock_openai_config",
-        "module_path": "dcx.providers.openai",
+        "config": {
+            "provider": "openai",
+            "api-key": "test-key",
+            "model": "gpt-4",
+            "description": "Test model",
+        },
+        "client_module": "openai",
         "client_class": "OpenAI",
         "provider_class": OpenAIProvider,
         "available_var": "OPENAI_AVAILABLE",
     },
     {
         "name": "anthropic",
-        "config_fixture": "mock_anthropic_config",
-        "module_path": "dcx.providers.anthropic",
+        "config": {
+            "provider": "anthropic",
+            "api-key": "test-key",
+            "model": "claude-3-opus-20240229",
+            "description": "Test model",
+        },
+        "client_module": "anthropic",
         "client_class": "Anthropic",
         "provider_class": AnthropicProvider,
         "available_var": "ANTHROPIC_AVAILABLE",
     },
     {
         "name": "gemini",
-        "config_fixture": "mock_gemini_config",
-        "module_path": "dcx.providers.gemini",
+        "config": {
+            "provider": "gemini",
+            "api-key": "test-key",
+            "model": "gemini-2.0-flash",
+            "description": "Test model",
+        },
+        "client_module": "openai",
         "client_class": "OpenAI",  # Gemini uses OpenAI client through compatibility layer
         "provider_class": GeminiProvider,
         "available_var": "OPENAI_AVAILABLE",
@@ -78,109 +77,84 @@ PROVIDER_PARAMS = [
 ]
 
 
+@pytest.fixture(params=PROVIDER_PARAMS, ids=[p["name"] for p in PROVIDER_PARAMS])
+def provider_param(request):
+    """Parameters for each provider."""
+    return request.param
+
+
+@pytest.fixture
+def mock_sdk_client(monkeypatch, provider_param):
+    """Mark the provider's SDK installed and mock its client class."""
+    mock_client = MagicMock()
+    monkeypatch.setattr(f"dcx.providers.{provider_param['available_var']}", True)
+    monkeypatch.setattr(
+        f"{provider_param['client_module']}.{provider_param['client_class']}",
+        mock_client,
+    )
+    return mock_client
+
+
 # --- Test Provider Initialization ---
 
 
-@pytest.mark.parametrize("provider_param", PROVIDER_PARAMS)
-def test_provider_init(request, provider_param):
+def test_provider_init(provider_param, mock_sdk_client):
     """Test provider initialization."""
-    # Get the config from the fixture
-    config = request.getfixturevalue(provider_param["config_fixture"])
+    config = provider_param["config"]
     provider_class = provider_param["provider_class"]
 
-    # Create patches
-    available_patch = patch(
-        f"{provider_param['module_path']}.{provider_param['available_var']}", True
-    )
-    client_patch = patch(
-        f"{provider_param['module_path']}.{provider_param['client_class']}"
-    )
-
-    # Apply patches
-    available_patch.start()
-    mock_client = client_patch.start()
+    # Create provider
+    provider = provider_class(config)
 
-    try:
-        # Setup the mock
-        mock_client_instance = MagicMock()
-        mock_client.return_value = mock_client_instance
+    # Check initialization
+    assert provider.model == config["model"]
+    assert provider.api_key == "test-key"
+    assert provider.client is not None
 
-        # Create provider
-        provider = provider_class(config)
+    # Check client initialization (special case for Gemini with base_url)
+    if "base_url" in provider_param:
+        mock_sdk_client.assert_called_once_with(
+            api_key="test-key", base_url=provider_param["base_url"]
+        )
+    else:
+        mock_sdk_client.assert_called_once_with(api_key="test-key")
 
-        # Check initialization
-        assert provider.model == config["model"]
-        assert provider.api_key == "test-key"
-        assert provider.client is not None
 
-        # Check client initialization (special case for Gemini with base_url)
-        if "base_url" in provider_param:
-            mock_client.assert_called_once_with(
-                api_key="test-key", base_url=provider_param["base_url"]
-            )
-        else:
-            mock_client.assert_called_once_with(api_key="test-key")
+def test_anthropic_client_shared():
+    """Test that Anthropic providers with the same API key share a client."""
+    with patch("dcx.providers.ANTHROPIC_AVAILABLE", True), patch(
+        "anthropic.Anthropic"
+    ) as mock_client:
+        first = AnthropicProvider(PROVIDER_PARAMS[1]["config"])
+        second = AnthropicProvider(PROVIDER_PARAMS[1]["config"])
 
-    finally:
-        # Clean up patches
-        available_patch.stop()
-        client_patch.stop()
+    assert first.client is second.client
+    mock_client.assert_called_once_with(api_key="test-key")
 
 
 # --- Test Get Provider ---
 
 
-@pytest.mark.parametrize("provider_param", PROVIDER_PARAMS)
-def test_get_provider(request, provider_param):
+def test_get_provider(provider_param, mock_sdk_client):
     """Test getting a provider instance."""
-    # Get the config from the fixture
-    config = request.getfixturevalue(provider_param["config_fixture"])
+    config = provider_param["config"]
     provider_class = provider_param["provider_class"]
 
-    # Create patches
-    module_available_patch = patch(
-        f"dcx.providers.{provider_param['available_var']}", True
-    )
-    provider_available_patch = patch(
-        f"{provider_param['module_path']}.{provider_param['available_var']}", True
-    )
-    client_patch = patch(
-        f"{provider_param['module_path']}.{provider_param['client_class']}"
-    )
-
-    # Apply patches
-    module_available_patch.start()
-    provider_available_patch.start()
-    mock_client = client_patch.start()
+    # Get provider
+    provider = get_provider(provider_param["name"], config)
 
-    try:
-        # Setup the mock
-        mock_client_instance = MagicMock()
-        mock_client.return_value = mock_client_instance
-
-        # Get provider
-        provider = get_provider(provider_param["name"], config)
-
-        # Check provider
-        assert provider is not None
-        assert isinstance(provider, provider_class)
-        assert provider.model == config["model"]
-
-    finally:
-        # Clean up patches
-        module_available_patch.stop()
-        provider_available_patch.stop()
-        client_patch.stop()
+    # Check provider
+    assert provider is not None
+    assert isinstance(provider, provider_class)
+    assert provider.model == config["model"]
 
 
 # --- Test Provider Not Available ---
 
 
-@pytest.mark.parametrize("provider_param", PROVIDER_PARAMS)
-def test_provider_not_available(request, provider_param):
+def test_provider_not_available(provider_param):
     """Test provider not available."""
-    # Get the config from the fixture
-    config = request.getfixturevalue(provider_param["config_fixture"])
+    config = provider_param["config"]
 
     # Create patch for the provider not being available at module level
     with patch(f"dcx.providers.{provider_param['available_var']}", False):
@@ -190,336 +164,222 @@ def test_provider_not_available(request, provider_param):
         # Provider should be None when package is not available
         assert provider is None
 
+        # The provider modules see the same flag
+        provider = provider_param["provider_class"](config)
+        assert provider.client is None
+        assert not provider.validate_config()
 
-# --- Test Completion Methods ---
 
+# --- Test Message Creation ---
 
-def _get_completion_test_params():
-    """Generate test parameters for get_completion tests."""
-    test_params = []
-
-    # OpenAI completion test parameters
-    test_params.append(
-        {
-            "provider_param": PROVIDER_PARAMS[0],  # OpenAI
-            "setup_mock": lambda mock_client: _setup_openai_completion_mock(
-                mock_client
-            ),
-            "expected_response": "Test response",
-            "expected_call": _verify_openai_completion_call,
-        }
-    )
 
-    # Anthropic completion test parameters
-    test_params.append(
-        {
-            "provider_param": PROVIDER_PARAMS[1],  # Anthropic
-            "setup_mock": lambda mock_client: _setup_anthropic_completion_mock(
-                mock_client
-            ),
-            "expected_response": "Test response",
-            "expected_call": _verify_anthropic_completion_call,
-        }
-    )
+@pytest.mark.parametrize(
+    "provider_class", [OpenAIProvider, GeminiProvider], ids=["openai", "gemini"]
+)
+def test_create_messages(provider_class):
+    """Test building chat messages for OpenAI-compatible providers."""
+    assert provider_class._create_messages("Test prompt", "System instructions") == [
+        {"role": "system", "content": "System instructions"},
+        {"role": "user", "content": "Test prompt"},
+    ]
+    assert provider_class._create_messages("Test prompt") == [
+        {"role": "user", "content": "Test prompt"}
+    ]
 
-    # Gemini completion test parameters (uses OpenAI client)
-    test_params.append(
-        {
-            "provider_param": PROVIDER_PARAMS[2],  # Gemini
-            "setup_mock": lambda mock_client: _setup_openai_completion_mock(
-                mock_client
-            ),
-            "expected_response": "Test response",
-            "expected_call": _verify_openai_completion_call,
-        }
-    )
 
-    return test_params
+# --- Test Completion Methods ---
 
+# Messages sent for the prompt "Test prompt" with "System instructions".
+# Anthropic takes the system prompt as a separate argument
+OPENAI_EXPECTED_MESSAGES = [
+    {"role": "system", "content": "System instructions"},
+    {"role": "user", "content": "Test prompt"},
+]
+ANTHROPIC_EXPECTED_MESSAGES = [{"role": "user", "content": "Test prompt"}]
 
-def _setup_openai_completion_mock(mock_client):
+
+def _setup_openai_completion_mock():
     """Setup mock for OpenAI completion."""
-    mock_client_instance = MagicMock()
-    mock_chat = MagicMock()
-    mock_completions = MagicMock()
-    mock_client_instance.chat = mock_chat
-    mock_chat.completions = mock_completions
-
-    # Setup mock response
-    mock_response = MagicMock()
-    mock_choice = MagicMock()
-    mock_message = MagicMock()
-    mock_message.content = "Test response"
-    mock_choice.message = mock_message
-    mock_response.choices = [mock_choice]
-    mock_completions.create.return_value = mock_response
-
-    return mock_client_instance
-
-
-def _verify_openai_completion_call(
-    mock_create, model, messages, temperature, max_tokens
-):
+    # Only the create method needs to record calls; the rest of the client
+    # and the response are plain namespaces
+    mock_response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="Test response"))]
+    )
+    return SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(create=MagicMock(return_value=mock_response))
+        )
+    )
+
+
+def _verify_openai_completion_call(mock_client, model, temperature, max_tokens):
     """Verify OpenAI completion call."""
-    mock_create.assert_called_once_with(
+    mock_client.chat.completions.create.assert_called_once_with(
         model=model,
-        messages=messages,
+        messages=OPENAI_EXPECTED_MESSAGES,
         temperature=temperature,
         max_tokens=max_tokens,
     )
 
 
-def _setup_anthropic_completion_mock(mock_client):
+def _setup_anthropic_completion_mock():
     """Setup mock for Anthropic completion."""
-    mock_client_instance = MagicMock()
-    mock_messages = MagicMock()
-    mock_client_instance.messages = mock_messages
-
-    # Setup mock response
-    mock_response = MagicMock()
-    mock_content = MagicMock()
-    mock_content.text = "Test response"
-    mock_response.content = [mock_content]
-    mock_messages.create.return_value = mock_response
-
-    return mock_client_instance
+    mock_response = SimpleNamespace(content=[SimpleNamespace(text="Test response")])
+    return SimpleNamespace(
+        messages=SimpleNamespace(create=MagicMock(return_value=mock_response))
+    )
 
 
-def _verify_anthropic_completion_call(
-    mock_create, model, messages, temperature, max_tokens
-):
+def _verify_anthropic_completion_call(mock_client, model, temperature, max_tokens):
     """Verify Anthropic completion call."""
-    mock_create.assert_called_once_with(
+    mock_client.messages.create.assert_called_once_with(
         model=model,
-        messages=messages,
+        messages=ANTHROPIC_EXPECTED_MESSAGES,
         system="System instructions",
         temperature=temperature,
         max_tokens=max_tokens,
     )
 
 
-@pytest.mark.parametrize("test_param", _get_completion_test_params())
-def test_get_completion(request, test_param):
-    """Test get_completion method for providers."""
-    provider_param = test_param["provider_param"]
-
-    # Get the config from the fixture
-    config = request.getfixturevalue(provider_param["config_fixture"])
-    provider_class = provider_param["provider_class"]
-
-    # Create patches
-    available_patch = patch(
-        f"{provider_param['module_path']}.{provider_param['available_var']}", True
-    )
-    client_patch = patch(
-        f"{provider_param['module_path']}.{provider_param['client_class']}"
-    )
-
-    # Apply patches
-    available_patch.start()
-    mock_client = client_patch.start()
-
-    try:
-        # Setup the mock client
-        mock_client_instance = test_param["setup_mock"](mock_client)
-        mock_client.return_value = mock_client_instance
-
-        # Create provider
-        provider = provider_class(config)
+# Gemini uses the OpenAI client through its compatibility layer
+COMPLETION_SETUPS = {
+    "openai": _setup_openai_completion_mock,
+    "anthropic": _setup_anthropic_completion_mock,
+    "gemini": _setup_openai_completion_mock,
+}
+COMPLETION_VERIFIERS = {
+    "openai": _verify_openai_completion_call,
+    "anthropic": _verify_anthropic_completion_call,
+    "gemini": _verify_openai_completion_call,
+}
 
-        # Test get_completion
-        response = provider.get_completion(
-            "Test prompt", "System instructions", 0.5, 100
-        )
-
-        # Verify response
-        assert response == test_param["expected_response"]
-
-        # Different path to the create method based on provider
-        if provider_param["name"] == "openai" or provider_param["name"] == "gemini":
-            mock_create = mock_client_instance.chat.completions.create
-            expected_messages = [
-                {"role": "system", "content": "System instructions"},
-                {"role": "user", "content": "Test prompt"},
-            ]
-        else:  # anthropic
-            mock_create = mock_client_instance.messages.create
-            expected_messages = [{"role": "user", "content": "Test prompt"}]
-
-        # Verify call
-        test_param["expected_call"](
-            mock_create, config["model"], expected_messages, 0.5, 100
-        )
 
-    finally:
-        # Clean up patches
-        available_patch.stop()
-        client_patch.stop()
+def test_get_completion(provider_param, mock_sdk_client):
+    """Test get_completion method for providers."""
+    config = provider_param["config"]
+    provider_class = provider_param["provider_class"]
 
+    # Setup the mock client
+    mock_client_instance = COMPLETION_SETUPS[provider_param["name"]]()
+    mock_sdk_client.return_value = mock_client_instance
 
-# --- Test Streaming Methods ---
+    # Create provider
+    provider = provider_class(config)
 
+    # Test get_completion
+    response = provider.get_completion("Test prompt", "System instructions", 0.5, 100)
 
-def _get_streaming_test_params():
-    """Generate test parameters for streaming tests."""
-    test_params = []
-
-    # OpenAI streaming test parameters
-    test_params.append(
-        {
-            "provider_param": PROVIDER_PARAMS[0],  # OpenAI
-            "setup_mock": lambda mock_client: _setup_openai_streaming_mock(mock_client),
-            "expected_chunks": ["Hello", " world", "!"],
-            "expected_call": _verify_openai_streaming_call,
-        }
-    )
+    # Verify response
+    assert response == "Test response"
 
-    # Anthropic streaming test parameters
-    test_params.append(
-        {
-            "provider_param": PROVIDER_PARAMS[1],  # Anthropic
-            "setup_mock": lambda mock_client: _setup_anthropic_streaming_mock(
-                mock_client
-            ),
-            "expected_chunks": ["Hello", " world", "!"],
-            "expected_call": _verify_anthropic_streaming_call,
-        }
+    # Verify call
+    COMPLETION_VERIFIERS[provider_param["name"]](
+        mock_client_instance, config["model"], 0.5, 100
     )
 
-    # Gemini streaming test parameters (uses OpenAI client)
-    test_params.append(
-        {
-            "provider_param": PROVIDER_PARAMS[2],  # Gemini
-            "setup_mock": lambda mock_client: _setup_openai_streaming_mock(mock_client),
-            "expected_chunks": ["Hello", " world", "!"],
-            "expected_call": _verify_openai_streaming_call,
-        }
-    )
 
-    return test_params
+# --- Test Streaming Methods ---
 
 
-def _setup_openai_streaming_mock(mock_client):
+def _setup_openai_streaming_mock():
     """Setup mock for OpenAI streaming."""
-    mock_client_instance = MagicMock()
-    mock_chat = MagicMock()
-    mock_completions = MagicMock()
-    mock_client_instance.chat = mock_chat
-    mock_chat.completions = mock_completions
-
-    # Setup mock stream response
-    class MockChunk:
-        def __init__(self, content):
-            self.choices = [MagicMock()]
-            self.choices[0].delta = MagicMock()
-            self.choices[0].delta.content = content
-
-    chunks = [MockChunk("Hello"), MockChunk(" world"), MockChunk("!")]
-    mock_completions.create.return_value = chunks
-
-    return mock_client_instance
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=c))])
+        for c in ["Hello", " world", "!"]
+    ]
+    return SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(create=MagicMock(return_value=chunks))
+        )
+    )
 
 
-def _verify_openai_streaming_call(
-    mock_create, model, messages, temperature, max_tokens
-):
+def _verify_openai_streaming_call(mock_client, model, temperature, max_tokens):
     """Verify OpenAI streaming call."""
-    mock_create.assert_called_once_with(
+    mock_client.chat.completions.create.assert_called_once_with(
         model=model,
-        messages=messages,
+        messages=OPENAI_EXPECTED_MESSAGES,
         temperature=temperature,
         max_tokens=max_tokens,
         stream=True,
     )
 
 
-def _setup_anthropic_streaming_mock(mock_client):
+def _setup_anthropic_streaming_mock():
     """Setup mock for Anthropic streaming."""
-    mock_client_instance = MagicMock()
-    mock_messages = MagicMock()
-    mock_client_instance.messages = mock_messages
-
-    # Setup mock stream
+    # The stream is used as a context manager, so it stays a MagicMock
     mock_stream = MagicMock()
-    mock_stream_instance = MagicMock()
-    mock_stream_instance.text_stream = iter(["Hello", " world", "!"])
-    mock_stream.__enter__.return_value = mock_stream_instance
-    mock_messages.stream.return_value = mock_stream
-
-    return mock_client_instance
+    mock_stream.__enter__.return_value = SimpleNamespace(
+        text_stream=iter(["Hello", " world", "!"])
+    )
+    return SimpleNamespace(
+        messages=SimpleNamespace(stream=MagicMock(return_value=mock_stream))
+    )
 
 
-def _verify_anthropic_streaming_call(
-    mock_create, model, messages, temperature, max_tokens
-):
+def _verify_anthropic_streaming_call(mock_client, model, temperature, max_tokens):
     """Verify Anthropic streaming call."""
-    mock_create.assert_called_once_with(
+    mock_client.messages.stream.assert_called_once_with(
         model=model,
-        messages=messages,
+        messages=ANTHROPIC_EXPECTED_MESSAGES,
         system="System instructions",
         temperature=temperature,
         max_tokens=max_tokens,
     )
 
 
-@pytest.mark.parametrize("test_param", _get_streaming_test_params())
-def test_get_completion_stream(request, test_param):
-    """Test streaming completions from provider."""
-    provider_param = test_param["provider_param"]
+STREAMING_SETUPS = {
+    "openai": _setup_openai_streaming_mock,
+    "anthropic": _setup_anthropic_streaming_mock,
+    "gemini": _setup_openai_streaming_mock,
+}
+STREAMING_VERIFIERS = {
+    "openai": _verify_openai_streaming_call,
+    "anthropic": _verify_anthropic_streaming_call,
+    "gemini": _verify_openai_streaming_call,
+}
+
 
-    # Get the config from the fixture
-    config = request.getfixturevalue(provider_param["config_fixture"])
+def test_get_completion_stream(provider_param, mock_sdk_client):
+    """Test streaming completions from provider."""
+    config = provider_param["config"]
     provider_class = provider_param["provider_class"]
 
-    # Create patches
-    available_patch = patch(
-        f"{provider_param['module_path']}.{provider_param['available_var']}", True
+    # Setup the mock client
+    mock_client_instance = STREAMING_SETUPS[provider_param["name"]]()
+    mock_sdk_client.return_value = mock_client_instance
+
+    # Create provider
+    provider = provider_class(config)
+
+    # Test get_completion_stream
+    stream = provider.get_completion_stream(
+        "Test prompt", "System instructions", 0.5, 100
     )
-    client_patch = patch(
-        f"{provider_param['module_path']}.{provider_param['client_class']}"
+    chunks = list(stream)  # Consume the stream
+
+    # Verify response
+    assert chunks == ["Hello", " world", "!"]
+
+    # Verify call
+    STREAMING_VERIFIERS[provider_param["name"]](
+        mock_client_instance, config["model"], 0.5, 100
     )
 
-    # Apply patches
-    available_patch.start()
-    mock_client = client_patch.start()
 
-    try:
-        # Setup mock client
-        mock_client_instance = test_param["setup_mock"](mock_client)
-        mock_client.return_value = mock_client_instance
+# --- Test warm up ---
 
-        # Create provider
-        provider = provider_class(config)
 
-        # Test get_completion_stream
-        stream = provider.get_completion_stream(
-            "Test prompt", "System instructions", 0.5, 100
-        )
-        chunks = list(stream)  # Consume the stream
-
-        # Verify response
-        assert chunks == test_param["expected_chunks"]
-
-        # Different path to the create method based on provider
-        if provider_param["name"] == "openai" or provider_param["name"] == "gemini":
-            mock_create = mock_client_instance.chat.completions.create
-            expected_messages = [
-                {"role": "system", "content": "System instructions"},
-                {"role": "user", "content": "Test prompt"},
-            ]
-        else:  # anthropic
-            mock_create = mock_client_instance.messages.stream
-            expected_messages = [{"role": "user", "content": "Test prompt"}]
-
-        # Verify call
-        test_param["expected_call"](
-            mock_create, config["model"], expected_messages, 0.5, 100
-        )
+def test_provider_warm_up(provider_param, mock_sdk_client):
+    """Test that warming up lists models and swallows errors."""
+    provider = provider_param["provider_class"](provider_param["config"])
+
+    models = provider.client.with_options.return_value.models
+    provider.warm_up()
+    models.list.assert_called_once_with()
 
-    finally:
-        # Clean up patches
-        available_patch.stop()
-        client_patch.stop()
+    models.list.side_effect = ConnectionError("offline")
+    provider.warm_up()
 
 
 # --- Test unsupported provider ---
@@ -531,3 +391,18 @@ def test_get_provider_unsupported():
 
     provider = get_provider("unsupported", config)
     assert provider is None
+
+
+# --- Test lazy imports ---
+
+
+def test_providers_import_sdks_lazily():
+    """Test that importing the providers does not import the SDKs."""
+    code = (
+        "import sys, dcx.providers as p; "
+        "assert p.AnthropicProvider.__name__ == 'AnthropicProvider'; "
+        "assert p.GeminiProvider({'provider': 'gemini'}).client is None; "
+        "assert 'openai' not in sys.modules and 'anthropic' not in sys.modules"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True)
+    assert result.returncode == 0, result.stderr.decode()
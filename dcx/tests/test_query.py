@@ -1,33 +1,34 @@
 """Tests for the query functionality."""
 
 import os
-import tempfile
+from array import array
 import pytest
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
-from dcx.query import format_context_from_files, create_prompt, execute_query
-
-
-@pytest.fixture
-def test_files():
-    """Create temporary files for testing."""
-    files = []
-
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f1:
-        f1.write("Test content for file 1")
-        files.append(Path(f1.name))
-
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as f2:
-        f2.write("Test content for file 2")
-        files.append(Path(f2.name))
-
-    yield files
-
-    # Clean up
-    for file_path in files:
-        if file_path.exists():
-            os.unlink(file_path)
+from dcx.query import (
+    format_context_from_files,
+    create_prompt,
+    execute_query,
+    execute_query_batch,
+)
+from dcx.utils.response_cache import (
+    add_semantic_response,
+    get_cached_response,
+    get_similar_response,
+    set_cached_response,
+)
+
+
+@pytest.fixture(scope="module")
+def test_files(tmp_path_factory):
+    """Create files for testing, shared by the tests in this module."""
+    base_dir = tmp_path_factory.mktemp("query")
+    files = [base_dir / "file1.txt", base_dir / "file2.txt"]
+    for index, file_path in enumerate(files, 1):
+        file_path.write_text(f"Test content for file {index}")
+    return files
 
 
 def test_format_context_from_files(test_files):
@@ -43,6 +44,14 @@ def test_format_context_from_files(test_files):
     # Tokens should be greater than 0
     assert tokens > 0
 
+    # Without filenames only the file contents are included
+    bare_context, bare_tokens = format_context_from_files(
+        test_files, include_filenames=False
+    )
+    assert bare_tokens == tokens
+    assert not any(file_path.name in bare_context for file_path in test_files)
+    assert bare_context.count("Test content for file") == 2
+
 
 def test_create_prompt():
     """Test creating prompts with context."""
@@ -65,34 +74,94 @@ def test_create_prompt():
     assert "print('hello')" in prompt
     assert "How many files are there?" in prompt
 
+    # Prompts for the same context differ only in their trailing query
+    other_prompt = create_prompt(context, "What is file2?", include_filenames=False)
+    assert prompt.endswith("How many files are there?")
+    assert other_prompt.endswith("What is file2?")
+    assert prompt.rsplit("\n", 1)[0] == other_prompt.rsplit("\n", 1)[0]
 
-@patch("dcx.query.load_config")
-@patch("dcx.query.get_context_set_files")
-@patch("dcx.query.get_provider")
-def test_execute_query(mock_get_provider, mock_get_files, mock_load_config, test_files):
-    """Test executing a query."""
-    # Mock config
-    mock_config = {
-        "Models": {
-            "test_model": {
-                "provider": "openai",
-                "api-key": "test-key",
-                "model": "gpt-4",
-            }
+
+# Configuration with a single model, as returned by load_config
+MOCK_CONFIG = {
+    "Models": {
+        "test_model": {
+            "provider": "openai",
+            "api-key": "test-key",
+            "model": "gpt-4",
         }
     }
-    mock_load_config.return_value = mock_config
+}
 
-    # Mock files
-    mock_get_files.return_value = test_files
 
-    # Mock provider
-    mock_provider = MagicMock()
-    mock_provider.validate_config.return_value = True
-    mock_provider.get_completion.return_value = "Test response"
-    mock_get_provider.return_value = mock_provider
+class LiveStub:
+    """Stand-in for rich's Live display that records what it renders."""
+
+    def __init__(self, *args, **kwargs):
+        self.renders = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    def update(self, renderable):
+        self.renders.append(renderable)
+
+
+@pytest.fixture
+def query_stubs(monkeypatch, test_files):
+    """
+    Replace the config, file lookup and provider used by execute_query.
+
+    The stubs record their arguments in ``calls``, keyed by function name.
+    Tests add the completion method they need to ``provider``.
+    """
+    calls = {
+        "load_config": [],
+        "get_context_set_files": [],
+        "get_provider": [],
+        "validate_config": [],
+    }
+
+    def recorder(name, result):
+        def stub(*args):
+            calls[name].append(args)
+            return result
+
+        return stub
+
+    provider = SimpleNamespace(
+        validate_config=recorder("validate_config", True), warm_up=lambda: None
+    )
+    monkeypatch.setattr("dcx.query.load_config", recorder("load_config", MOCK_CONFIG))
+    monkeypatch.setattr(
+        "dcx.query.get_context_set_files",
+        recorder("get_context_set_files", test_files),
+    )
+    monkeypatch.setattr("dcx.query.get_provider", recorder("get_provider", provider))
+    return SimpleNamespace(calls=calls, provider=provider)
+
+
+@pytest.mark.parametrize(
+    "stream, method",
+    [(False, "get_completion"), (True, "get_completion_stream")],
+    ids=["complete", "stream"],
+)
+def test_execute_query(monkeypatch, query_stubs, test_files, stream, method):
+    """Test executing a query, with and without streaming."""
+    completions = []
+
+    def complete(*args):
+        completions.append(args)
+        return iter(["Test ", "response ", "chunks"]) if stream else "Test response"
+
+    setattr(query_stubs.provider, method, complete)
+
+    # Replace the Live display used for streaming
+    live = LiveStub()
+    monkeypatch.setattr("dcx.query.Live", lambda *args, **kwargs: live)
 
-    # Execute query (non-streaming)
     execute_query(
         "Test query",
         "test_set",
@@ -100,19 +169,21 @@ def test_execute_query(mock_get_provider, mock_get_files, mock_load_config, test
         system_prompt="Test system prompt",
         temperature=0.5,
         max_tokens=100,
-        stream=False,
+        stream=stream,
     )
 
     # Verify
-    mock_load_config.assert_called_once()
-    mock_get_files.assert_called_once_with("test_set", None)
-    mock_get_provider.assert_called_once_with(
-        "test_model", mock_config["Models"]["test_model"]
-    )
-    mock_provider.validate_config.assert_called_once()
+    calls = query_stubs.calls
+    assert len(calls["load_config"]) == 1
+    assert calls["get_context_set_files"] == [("test_set", None)]
+    assert calls["get_provider"] == [
+        ("test_model", MOCK_CONFIG["Models"]["test_model"])
+    ]
+    assert len(calls["validate_config"]) == 1
 
     # Check the prompt contains the content from files
-    call_args = mock_provider.get_completion.call_args[0]
+    assert len(completions) == 1
+    call_args = completions[0]
     prompt = call_args[0]
     for file_path in test_files:
         assert file_path.name in prompt
@@ -123,95 +194,106 @@ def test_execute_query(mock_get_provider, mock_get_files, mock_load_config, test
     assert call_args[2] == 0.5
     assert call_args[3] == 100
 
+    # A streamed response is rendered live, ending with the complete text
+    if stream:
+        assert live.renders[-1].markup == "Test response chunks"
+    else:
+        assert not live.renders
 
+
+@pytest.mark.parametrize("temperature, expected_calls", [(0, 1), (0.5, 2)])
 @patch("dcx.query.load_config")
 @patch("dcx.query.get_context_set_files")
 @patch("dcx.query.get_provider")
-@patch("dcx.query.Live")  # Mock the rich.live.Live class
-def test_execute_query_stream(
-    mock_live, mock_get_provider, mock_get_files, mock_load_config, test_files
+def test_execute_query_response_cache(
+    mock_get_provider,
+    mock_get_files,
+    mock_load_config,
+    test_files,
+    temperature,
+    expected_calls,
 ):
-    """Test executing a streaming query."""
-    # Mock config
-    mock_config = {
+    """Test that only deterministic queries are served from the response cache."""
+    mock_load_config.return_value = {
+        "Cache": {"enabled": True},
         "Models": {
             "test_model": {
                 "provider": "openai",
                 "api-key": "test-key",
                 "model": "gpt-4",
             }
-        }
+        },
     }
-    mock_load_config.return_value = mock_config
-
-    # Mock files
     mock_get_files.return_value = test_files
-
-    # Mock provider
     mock_provider = MagicMock()
     mock_provider.validate_config.return_value = True
-    mock_provider.get_completion_stream.return_value = ["Test ", "response ", "chunks"]
+    mock_provider.get_completion.return_value = "Test response"
     mock_get_provider.return_value = mock_provider
 
-    # Mock Live context manager
-    mock_live_instance = MagicMock()
-    mock_live.return_value.__enter__.return_value = mock_live_instance
+    for _ in range(2):
+        execute_query(
+            "Test query",
+            "test_set",
+            "test_model",
+            temperature=temperature,
+            stream=False,
+            save_history=False,
+        )
 
-    # Execute query (streaming)
-    execute_query(
-        "Test query",
-        "test_set",
-        "test_model",
-        system_prompt="Test system prompt",
-        temperature=0.5,
-        max_tokens=100,
-        stream=True,
-    )
-
-    # Verify
-    mock_load_config.assert_called_once()
-    mock_get_files.assert_called_once_with("test_set", None)
-    mock_get_provider.assert_called_once_with(
-        "test_model", mock_config["Models"]["test_model"]
-    )
-    mock_provider.validate_config.assert_called_once()
-
-    # Check the streaming function was called
-    assert mock_provider.get_completion_stream.called
-
-    # Check the prompt contains the content from files
-    call_args = mock_provider.get_completion_stream.call_args[0]
-    prompt = call_args[0]
-    for file_path in test_files:
-        assert file_path.name in prompt
-    assert "Test query" in prompt
-
-    # Check other parameters
-    assert call_args[1] == "Test system prompt"
-    assert call_args[2] == 0.5
-    assert call_args[3] == 100
+    assert mock_provider.get_completion.call_count == expected_calls
 
 
+@patch("dcx.query.SEMANTIC_CACHE_AVAILABLE", True)
+@patch("dcx.query.embed_query")
 @patch("dcx.query.load_config")
-def test_execute_query_model_not_found(mock_load_config):
-    """Test executing a query with a model that doesn't exist."""
-    # Mock config with no models
-    mock_config = {"Models": {}}
-    mock_load_config.return_value = mock_config
+@patch("dcx.query.get_context_set_files")
+@patch("dcx.query.get_provider")
+def test_execute_query_semantic_cache(
+    mock_get_provider, mock_get_files, mock_load_config, mock_embed, test_files
+):
+    """Test that a paraphrased query is served from the semantic cache."""
+    mock_load_config.return_value = {
+        "Cache": {"enabled": True, "semantic": True},
+        "Models": {
+            "test_model": {
+                "provider": "openai",
+                "api-key": "test-key",
+                "model": "gpt-4",
+            }
+        },
+    }
+    mock_get_files.return_value = test_files
+    mock_provider = MagicMock()
+    mock_provider.validate_config.return_value = True
+    mock_provider.get_completion.return_value = "Test response"
+    mock_get_provider.return_value = mock_provider
 
-    # Execute query
-    execute_query("Test query", "test_set", "nonexistent_model")
+    # Near-identical embeddings for the paraphrases, an orthogonal one otherwise
+    vectors = {
+        "What does this do?": array("f", [1.0, 0.0]),
+        "Explain what this does": array("f", [0.96, 0.28]),
+        "Unrelated question": array("f", [0.0, 1.0]),
+    }
+    mock_embed.side_effect = vectors.get
 
-    # Only load_config should be called
-    mock_load_config.assert_called_once()
+    for query in vectors:
+        execute_query(query, "test_set", "test_model", temperature=0, stream=False)
 
+    prompts = [call[0][0] for call in mock_provider.get_completion.call_args_list]
+    assert len(prompts) == 2
+    assert "What does this do?" in prompts[0]
+    assert "Unrelated question" in prompts[1]
 
+
+@patch("dcx.query.save_query_to_history")
 @patch("dcx.query.load_config")
 @patch("dcx.query.get_context_set_files")
-def test_execute_query_set_not_found(mock_get_files, mock_load_config):
-    """Test executing a query with a context set that doesn't exist."""
-    # Mock config
-    mock_config = {
+@patch("dcx.query.get_provider")
+def test_execute_query_multiple_sets(
+    mock_get_provider, mock_get_files, mock_load_config, mock_save, test_files
+):
+    """Test that multiple sets are matched once each and counted without duplicates."""
+    mock_load_config.return_value = {
         "Models": {
             "test_model": {
                 "provider": "openai",
@@ -220,14 +302,210 @@ def test_execute_query_set_not_found(mock_get_files, mock_load_config):
             }
         }
     }
-    mock_load_config.return_value = mock_config
+    mock_get_files.side_effect = lambda set_name, config_path: {
+        "first": test_files,
+        "second": test_files[1:],
+    }[set_name]
+    mock_provider = MagicMock()
+    mock_provider.validate_config.return_value = True
+    mock_provider.get_completion.return_value = "Test response"
+    mock_get_provider.return_value = mock_provider
+
+    execute_query("Test query", "first,second", "test_model", stream=False)
+
+    assert mock_get_files.call_count == 2
+    assert mock_save.call_args.kwargs["files_count"] == len(test_files)
+    assert mock_save.call_args.kwargs["set_name"] == "first, second"
+
+
+@patch("dcx.query.save_query_to_history")
+@patch("dcx.query.load_config")
+@patch("dcx.query.get_context_set_files")
+@patch("dcx.query.get_provider")
+def test_execute_query_batch(
+    mock_get_provider, mock_get_files, mock_load_config, mock_save, test_files
+):
+    """Test querying several models with one shared context."""
+    mock_load_config.return_value = {
+        "Models": {
+            name: {"provider": "openai", "api-key": "test-key", "model": name}
+            for name in ("first", "second")
+        }
+    }
+    mock_get_files.return_value = test_files
+
+    def make_provider(model_name, model_config):
+        provider = MagicMock()
+        provider.validate_config.return_value = True
+        provider.get_completion.return_value = f"Response from {model_name}"
+        return provider
+
+    mock_get_provider.side_effect = make_provider
+
+    with patch.dict(os.environ, {"DCX_CONCURRENCY": "2"}):
+        execute_query_batch("Test query", "test_set", ["first", "second"])
+
+    mock_get_files.assert_called_once_with("test_set", None)
+    saved = [call.kwargs for call in mock_save.call_args_list]
+    assert [(s["model_name"], s["response"]) for s in saved] == [
+        ("first", "Response from first"),
+        ("second", "Response from second"),
+    ]
+
 
-    # Mock set not found
-    mock_get_files.side_effect = KeyError("test_set not found")
+def _raise_keyerror(*args, **kwargs):
+    raise KeyError("test_set not found")
+
+
+def test_execute_query_model_not_found(monkeypatch, query_stubs, capsys):
+    """Test executing a query with a model that doesn't exist."""
+    # Config with no models
+    monkeypatch.setattr("dcx.query.load_config", lambda *args: {"Models": {}})
+
+    execute_query("Test query", "test_set", "nonexistent_model")
+
+    # The query stops before a provider is created
+    assert "Model 'nonexistent_model' not found" in capsys.readouterr().out
+    assert query_stubs.calls["get_provider"] == []
+
+
+def test_execute_query_set_not_found(monkeypatch, query_stubs, capsys):
+    """Test executing a query with a context set that doesn't exist."""
+    monkeypatch.setattr("dcx.query.get_context_set_files", _raise_keyerror)
 
-    # Execute query
     execute_query("Test query", "nonexistent_set", "test_model")
 
-    # Verify
-    mock_load_config.assert_called_once()
-    mock_get_files.assert_called_once()
+    assert "Context set 'nonexistent_set' not found" in capsys.readouterr().out
+    assert len(query_stubs.calls["load_config"]) == 1
+
+
+def test_execute_query_empty_set_non_interactive(monkeypatch, query_stubs, capsys):
+    """Test that an empty context set cancels a non-interactive query."""
+    monkeypatch.setattr("dcx.query.get_context_set_files", lambda *args: [])
+
+    def fail_input(*args, **kwargs):
+        raise AssertionError("non-interactive queries must not prompt")
+
+    monkeypatch.setattr("dcx.query.console.input", fail_input)
+
+    execute_query("Test query", "test_set", "test_model", interactive=False)
+
+    assert "Query cancelled: the context is empty." in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "chunks, expected_streams",
+    [
+        (["Hello", "Error: boom"], 2),
+        # Only a final chunk reports a failure
+        (["Error: messages", " start with a prefix"], 1),
+    ],
+    ids=["failed", "error-text"],
+)
+def test_execute_query_failed_stream_not_cached(
+    monkeypatch, query_stubs, chunks, expected_streams
+):
+    """Test that a stream ending in an error is not stored in the response cache."""
+    config = dict(MOCK_CONFIG, Cache={"enabled": True})
+    monkeypatch.setattr("dcx.query.load_config", lambda *args: config)
+    monkeypatch.setattr("dcx.query.Live", LiveStub)
+    streams = []
+
+    def get_completion_stream(*args):
+        streams.append(args)
+        return iter(chunks)
+
+    query_stubs.provider.get_completion_stream = get_completion_stream
+
+    for _ in range(2):
+        execute_query("Test query", "test_set", "test_model", temperature=0)
+
+    assert len(streams) == expected_streams
+
+
+def test_execute_query_failed_stream_not_in_semantic_cache(monkeypatch, query_stubs):
+    """Test that a stream ending in an error is not stored for paraphrases."""
+    config = dict(MOCK_CONFIG, Cache={"enabled": True, "semantic": True})
+    monkeypatch.setattr("dcx.query.load_config", lambda *args: config)
+    monkeypatch.setattr("dcx.query.Live", LiveStub)
+    monkeypatch.setattr("dcx.query.SEMANTIC_CACHE_AVAILABLE", True)
+    monkeypatch.setattr("dcx.query.embed_query", lambda query: array("f", [1.0]))
+    stored = []
+    monkeypatch.setattr(
+        "dcx.query.add_semantic_response", lambda *args: stored.append(args)
+    )
+    query_stubs.provider.get_completion_stream = lambda *args: iter(
+        ["Hello", "Error: boom"]
+    )
+
+    execute_query("Test query", "test_set", "test_model", temperature=0)
+
+    assert stored == []
+
+
+@pytest.mark.parametrize("enabled, expected_warm_ups", [(False, 2), (True, 1)])
+def test_execute_query_warm_up(monkeypatch, query_stubs, enabled, expected_warm_ups):
+    """Test that answers from the response cache don't warm up the provider."""
+    config = dict(MOCK_CONFIG, Cache={"enabled": enabled})
+    monkeypatch.setattr("dcx.query.load_config", lambda *args: config)
+    warm_ups = []
+    monkeypatch.setattr("dcx.query._start_warm_up", warm_ups.append)
+    query_stubs.provider.get_completion = lambda *args: "Test response"
+
+    for _ in range(2):
+        execute_query(
+            "Test query", "test_set", "test_model", temperature=0, stream=False
+        )
+
+    assert warm_ups == [query_stubs.provider] * expected_warm_ups
+
+
+def test_execute_query_semantic_cache_failure(monkeypatch, query_stubs, capsys):
+    """Test that a failing embedding model doesn't stop the query."""
+    config = dict(MOCK_CONFIG, Cache={"enabled": True, "semantic": True})
+    monkeypatch.setattr("dcx.query.load_config", lambda *args: config)
+    monkeypatch.setattr("dcx.query.SEMANTIC_CACHE_AVAILABLE", True)
+
+    def fail_embed(query):
+        raise OSError("model download failed")
+
+    monkeypatch.setattr("dcx.query.embed_query", fail_embed)
+    completions = []
+
+    def get_completion(*args):
+        completions.append(args)
+        return "Test response"
+
+    query_stubs.provider.get_completion = get_completion
+
+    for _ in range(2):
+        execute_query(
+            "Test query", "test_set", "test_model", temperature=0, stream=False
+        )
+
+    out = capsys.readouterr().out
+    assert "Semantic caching failed: model download failed" in out
+    # The exact-match cache still answers the repeated query
+    assert len(completions) == 1
+    assert "Test response" in out
+
+
+def test_response_cache_prunes_expired(monkeypatch):
+    """Test that storing a response deletes expired entries."""
+    now = 1_000_000
+    monkeypatch.setattr(
+        "dcx.utils.response_cache.time", SimpleNamespace(time=lambda: now)
+    )
+    set_cached_response("old", "Old response", ttl=60)
+    add_semantic_response("scope", array("f", [1.0]), "Old response", ttl=60)
+
+    now += 120
+    set_cached_response("new", "New response", ttl=60)
+    add_semantic_response("scope", array("f", [0.0]), "New response", ttl=60)
+
+    # Expired entries are gone even for lookups with a longer TTL
+    assert get_cached_response("old", ttl=3600) is None
+    assert get_cached_response("new", ttl=3600) == "New response"
+    assert get_similar_response("scope", array("f", [1.0]), 0.0, 3600) == (
+        "New response"
+    )
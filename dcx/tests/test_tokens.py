@@ -1,14 +1,25 @@
 """Tests for token counting utilities."""
 
 import os
+import sqlite3
 import tempfile
+from contextlib import closing
 import pytest
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
+from dcx.utils.token_cache import get_cached_tokens, set_cached_tokens
 from dcx.utils.tokens import (
+    TIKTOKEN_TOKENIZER_NAME,
+    TOKENIZER_NAME,
+    TOKEN_PATTERN,
+    TokenInfo,
+    count_tokens,
     count_tokens_simple,
     count_tokens_in_file,
     format_token_count,
+    get_tokenizer_name,
+    read_file_with_tokens,
 )
 
 
@@ -30,6 +41,38 @@ def test_count_tokens_simple():
     assert tokens > 10  # Exact count will depend on tokenization rules
 
 
+@pytest.mark.parametrize(
+    "text",
+    [
+        "foo_bar(x1, y2) -> 3.14;",
+        "\tword\x0bword\x1cword\x1f--\r\n",
+        "  leading and trailing  ",
+        "caf\u00e9, na\u00efve \u2014 \u00fcber!",
+    ],
+)
+def test_count_tokens_simple_matches_pattern(text):
+    """Test that the ASCII fast path counts exactly what TOKEN_PATTERN finds."""
+    assert count_tokens_simple(text) == len(TOKEN_PATTERN.findall(text))
+
+
+@patch("dcx.utils.tokens._tiktoken_failed", False)
+@patch("dcx.utils.tokens.TIKTOKEN_AVAILABLE", True)
+def test_count_tokens_with_tiktoken():
+    """Test that tiktoken is used when installed and falls back when unusable."""
+    mock_encoding = MagicMock()
+    mock_encoding.encode_ordinary.return_value = [1, 2, 3]
+
+    with patch("dcx.utils.tokens._get_encoding", return_value=mock_encoding):
+        assert count_tokens("Hello, world!") == 3
+        assert get_tokenizer_name() == TIKTOKEN_TOKENIZER_NAME
+
+    with patch("dcx.utils.tokens._get_encoding", return_value=None):
+        assert count_tokens("Hello, world!") == count_tokens_simple("Hello, world!")
+
+    with patch("dcx.utils.tokens._tiktoken_failed", True):
+        assert get_tokenizer_name() == TOKENIZER_NAME
+
+
 @pytest.fixture
 def temp_text_file():
     """Create a temporary file with test content."""
@@ -50,22 +93,81 @@ def test_count_tokens_in_file(temp_text_file):
     result = count_tokens_in_file(temp_text_file)
 
     # Check structure
-    assert "size_bytes" in result
-    assert "tokens" in result
+    assert isinstance(result, TokenInfo)
 
     # Check values
-    assert result["size_bytes"] > 0
-    assert result["tokens"] > 0
+    assert result.size_bytes > 0
+    assert result.tokens > 0
 
     # Exact count should reflect the content
-    assert result["tokens"] >= 10  # Approximate number of tokens in the content
+    assert result.tokens >= 10  # Approximate number of tokens in the content
+
+
+def test_count_tokens_in_file_uses_cache(temp_text_file, isolated_cache_dir):
+    """Test that token counts are cached until the file changes."""
+    first = count_tokens_in_file(temp_text_file)
+    assert (isolated_cache_dir / "tokens.sqlite").exists()
+
+    # An unchanged file is served from the cache without re-tokenizing
+    with patch("dcx.utils.tokens.count_tokens_simple") as mock_count:
+        assert count_tokens_in_file(temp_text_file) == first
+        mock_count.assert_not_called()
+
+    # A modified file is tokenized again
+    temp_text_file.write_text("Just four tokens here", encoding="utf-8")
+    assert count_tokens_in_file(temp_text_file).tokens == 4
+
+
+def test_token_cache_disabled_after_error(isolated_cache_dir):
+    """Test that a failing cache query turns the cache off for the process."""
+    set_cached_tokens("/a.txt", "enc", 1, 2, 3)
+    db_path = isolated_cache_dir / "tokens.sqlite"
+    with closing(sqlite3.connect(db_path)) as connection:
+        connection.execute("ALTER TABLE tok RENAME TO broken")
+        connection.commit()
+
+    assert get_cached_tokens("/a.txt", "enc", 1, 2) is None
+
+    # The database is left alone even once it works again
+    with closing(sqlite3.connect(db_path)) as connection:
+        connection.execute("ALTER TABLE broken RENAME TO tok")
+        connection.commit()
+    assert get_cached_tokens("/a.txt", "enc", 1, 2) is None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+@pytest.mark.parametrize(
+    "content",
+    [
+        "alpha beta,gamma\n\ndelta_epsilon(zeta)  eta.  \ntheta-iota kappa",
+        '{"alpha":[1,2,3],"beta":"gamma_delta"}' * 4 + "x" * 100 + "ünï,cödé" * 3,
+    ],
+    ids=["text", "no-whitespace"],
+)
+def test_count_tokens_in_file_in_chunks(tmp_path, chunk_size, content):
+    """Test that counting in chunks never splits or merges tokens."""
+    file_path = tmp_path / "chunks.txt"
+    file_path.write_text(content, encoding="utf-8")
+
+    with patch("dcx.utils.tokens.COUNT_CHUNK_SIZE", chunk_size):
+        result = count_tokens_in_file(file_path)
+
+    assert result.tokens == count_tokens_simple(content)
+
+
+def test_read_file_with_tokens(temp_text_file):
+    """Test reading a file and counting its tokens together."""
+    content, tokens = read_file_with_tokens(temp_text_file)
+
+    assert content == temp_text_file.read_text(encoding="utf-8")
+    assert tokens == count_tokens_in_file(temp_text_file).tokens
 
 
 def test_count_tokens_nonexistent_file():
     """Test counting tokens in a nonexistent file."""
     result = count_tokens_in_file(Path("/nonexistent/file"))
-    assert result["size_bytes"] == 0
-    assert result["tokens"] == 0
+    assert result.size_bytes == 0
+    assert result.tokens == 0
 
 
 def test_format_token_count():
@@ -83,3 +185,10 @@ def test_format_token_count():
     # Millions
     assert format_token_count(1000000) == "1.0M"
     assert format_token_count(2500000) == "2.5M"
+
+    # Rounding to tenths, including up into the next unit
+    assert format_token_count(1249) == "1.2K"
+    assert format_token_count(1250) == "1.3K"
+    assert format_token_count(999949) == "999.9K"
+    assert format_token_count(999950) == "1.0M"
+    assert format_token_count(12345678) == "12.3M"
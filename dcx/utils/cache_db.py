@@ -0,0 +1,72 @@
+"""Shared SQLite plumbing for the persistent caches.
+
+Each cache keeps a single connection per process, shared by worker threads
+under a lock. Caches are best-effort: once opening or querying the database
+fails, it is left alone for the rest of the process.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .paths import get_cache_dir
+
+
+class CacheDatabase:
+    """A SQLite database file in the cache directory."""
+
+    def __init__(self, file_name: str, schema: str):
+        """
+        Args:
+            file_name: Name of the database file in the cache directory
+            schema: SQL script creating the tables, run on every connect
+        """
+        self.file_name = file_name
+        self.schema = schema
+        self.lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_path: Optional[Path] = None
+        self._disabled_path: Optional[Path] = None
+
+    def connect(self) -> Optional[sqlite3.Connection]:
+        """
+        Open (or reuse) the database. Must be called with ``lock`` held.
+
+        Returns:
+            The connection, or None if the cache is disabled
+        """
+        db_path = get_cache_dir() / self.file_name
+        if self._connection is not None and self._connection_path == db_path:
+            return self._connection
+        if self._disabled_path == db_path:
+            return None
+
+        self._close()
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(db_path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.schema)
+        except (OSError, sqlite3.Error):
+            self._disabled_path = db_path
+            return None
+
+        self._connection = connection
+        self._connection_path = db_path
+        return connection
+
+    def disable(self) -> None:
+        """
+        Stop using the database for the rest of the process, after a query
+        on it failed. Must be called with ``lock`` held.
+        """
+        self._disabled_path = self._connection_path
+        self._close()
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            self._connection_path = None
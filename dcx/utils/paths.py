@@ -0,0 +1,12 @@
+"""Filesystem locations used by dot-context."""
+
+import os
+from pathlib import Path
+
+# Default cache location in user's home directory
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".dcx", "cache")
+
+
+def get_cache_dir() -> Path:
+    """Get the directory for cache files."""
+    return Path(os.environ.get("DCX_CACHE_DIR", DEFAULT_CACHE_DIR))
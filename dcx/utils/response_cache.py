@@ -0,0 +1,228 @@
+"""Persistent response cache for dot-context.
+
+Responses are stored in a SQLite database next to the token cache, keyed by
+a hash of everything that determines the request: provider, model, prompts,
+temperature and token limit. Like the token cache it is best-effort, and any
+database error simply disables it for the rest of the process.
+
+With the optional sentence-transformers package installed, responses can
+also be matched semantically: paraphrased queries against the same context
+and model are answered from the cache when their embeddings are similar
+enough.
+"""
+
+import functools
+import hashlib
+import importlib.util
+import json
+import sqlite3
+import time
+from array import array
+from typing import Any, Optional
+
+from .cache_db import CacheDatabase
+
+CACHE_FILE_NAME = "responses.sqlite"
+
+# Default number of seconds a cached response stays valid
+DEFAULT_RESPONSE_TTL = 1800
+
+# Semantic matching needs sentence-transformers, which is slow to import, so
+# it is only checked for here and imported on first use
+SEMANTIC_CACHE_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+# Embedding model used for semantic matching
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Default minimum cosine similarity for a semantic cache hit
+DEFAULT_SIMILARITY = 0.93
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    ts INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS semantic (
+    scope TEXT NOT NULL,
+    vec BLOB NOT NULL,
+    response TEXT NOT NULL,
+    ts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS semantic_scope ON semantic (scope);
+CREATE INDEX IF NOT EXISTS response_ts ON response (ts);
+CREATE INDEX IF NOT EXISTS semantic_ts ON semantic (ts);
+"""
+
+_db = CacheDatabase(CACHE_FILE_NAME, _SCHEMA)
+
+
+def make_response_key(
+    provider: str,
+    model: str,
+    prompt: str,
+    system_prompt: Optional[str],
+    temperature: float,
+    max_tokens: Optional[int],
+) -> str:
+    """
+    Build the cache key for a completion request.
+
+    Returns:
+        Hex SHA-256 digest of the request parameters
+    """
+    request = [provider, model, system_prompt, prompt, temperature, max_tokens]
+    return hashlib.sha256(json.dumps(request).encode("utf-8")).hexdigest()
+
+
+def get_cached_response(key: str, ttl: int = DEFAULT_RESPONSE_TTL) -> Optional[str]:
+    """
+    Look up a cached response.
+
+    Args:
+        key: Key from make_response_key
+        ttl: Maximum age of the cached response in seconds
+
+    Returns:
+        The cached response, or None if missing or expired
+    """
+    with _db.lock:
+        connection = _db.connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT response, ts FROM response WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            _db.disable()
+            return None
+
+    if row is None or time.time() - row[1] > ttl:
+        return None
+    return row[0]
+
+
+def set_cached_response(
+    key: str, response: str, ttl: int = DEFAULT_RESPONSE_TTL
+) -> None:
+    """
+    Store a response in the cache.
+
+    Responses older than ``ttl`` are deleted at the same time, so the
+    database does not grow without bound.
+
+    Args:
+        key: Key from make_response_key
+        response: The model's response
+        ttl: Maximum age of cached responses in seconds
+    """
+    with _db.lock:
+        connection = _db.connect()
+        if connection is None:
+            return
+        try:
+            now = int(time.time())
+            connection.execute("DELETE FROM response WHERE ts < ?", (now - ttl,))
+            connection.execute(
+                "INSERT OR REPLACE INTO response (key, response, ts) VALUES (?, ?, ?)",
+                (key, response, now),
+            )
+            connection.commit()
+        except sqlite3.Error:
+            _db.disable()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoder() -> Any:
+    """Load the sentence embedding model once per process."""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+def embed_query(query: str) -> array:
+    """
+    Embed a query for semantic matching.
+
+    Args:
+        query: The query text
+
+    Returns:
+        Unit-length embedding as a float array
+    """
+    return array("f", _get_encoder().encode(query, normalize_embeddings=True))
+
+
+def get_similar_response(
+    scope: str,
+    query_vec: array,
+    similarity: float = DEFAULT_SIMILARITY,
+    ttl: int = DEFAULT_RESPONSE_TTL,
+) -> Optional[str]:
+    """
+    Find the cached response for the most similar earlier query.
+
+    Args:
+        scope: Key for everything but the query, from make_response_key
+        query_vec: Embedding from embed_query
+        similarity: Minimum cosine similarity for a match
+        ttl: Maximum age of the cached response in seconds
+
+    Returns:
+        The best matching response, or None if no earlier query is close enough
+    """
+    with _db.lock:
+        connection = _db.connect()
+        if connection is None:
+            return None
+        try:
+            rows = connection.execute(
+                "SELECT vec, response FROM semantic WHERE scope = ? AND ts >= ?",
+                (scope, int(time.time() - ttl)),
+            ).fetchall()
+        except sqlite3.Error:
+            _db.disable()
+            return None
+
+    best_response = None
+    best_score = similarity
+    for blob, response in rows:
+        cached_vec = array("f")
+        cached_vec.frombytes(blob)
+        # Embeddings are unit length, so the dot product is the cosine similarity
+        score = sum(a * b for a, b in zip(query_vec, cached_vec))
+        if score >= best_score:
+            best_response, best_score = response, score
+    return best_response
+
+
+def add_semantic_response(
+    scope: str, query_vec: array, response: str, ttl: int = DEFAULT_RESPONSE_TTL
+) -> None:
+    """
+    Store a response for semantic matching.
+
+    Entries older than ``ttl`` are deleted at the same time, so lookups only
+    ever scan the unexpired entries.
+
+    Args:
+        scope: Key for everything but the query, from make_response_key
+        query_vec: Embedding from embed_query
+        response: The model's response
+        ttl: Maximum age of cached responses in seconds
+    """
+    with _db.lock:
+        connection = _db.connect()
+        if connection is None:
+            return
+        try:
+            now = int(time.time())
+            connection.execute("DELETE FROM semantic WHERE ts < ?", (now - ttl,))
+            connection.execute(
+                "INSERT INTO semantic (scope, vec, response, ts) VALUES (?, ?, ?, ?)",
+                (scope, query_vec.tobytes(), response, now),
+            )
+            connection.commit()
+        except sqlite3.Error:
+            _db.disable()
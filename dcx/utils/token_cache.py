@@ -0,0 +1,86 @@
+"""Persistent token count cache for dot-context.
+
+Token counts are stored in a small SQLite database keyed by absolute file
+path and tokenizer name, and are only reused while the file's modification
+time and size are unchanged. The cache is best-effort: any database error
+simply disables it for the rest of the process.
+"""
+
+import sqlite3
+from typing import Optional
+
+from .cache_db import CacheDatabase
+
+CACHE_FILE_NAME = "tokens.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tok (
+    path TEXT NOT NULL,
+    enc TEXT NOT NULL,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    tokens INTEGER NOT NULL,
+    PRIMARY KEY (path, enc)
+)
+"""
+
+_db = CacheDatabase(CACHE_FILE_NAME, _SCHEMA)
+
+
+def get_cached_tokens(path: str, encoding: str, mtime: int, size: int) -> Optional[int]:
+    """
+    Look up a cached token count.
+
+    Args:
+        path: Absolute path of the file
+        encoding: Name of the tokenizer that produced the count
+        mtime: File modification time in nanoseconds
+        size: File size in bytes
+
+    Returns:
+        The cached token count, or None if missing or stale
+    """
+    with _db.lock:
+        connection = _db.connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT mtime, size, tokens FROM tok WHERE path = ? AND enc = ?",
+                (path, encoding),
+            ).fetchone()
+        except sqlite3.Error:
+            _db.disable()
+            return None
+
+    if row is None or row[0] != mtime or row[1] != size:
+        return None
+    return row[2]
+
+
+def set_cached_tokens(
+    path: str, encoding: str, mtime: int, size: int, tokens: int
+) -> None:
+    """
+    Store a token count in the cache.
+
+    Args:
+        path: Absolute path of the file
+        encoding: Name of the tokenizer that produced the count
+        mtime: File modification time in nanoseconds
+        size: File size in bytes
+        tokens: Token count to store
+    """
+    with _db.lock:
+        connection = _db.connect()
+        if connection is None:
+            return
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO tok (path, enc, mtime, size, tokens) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (path, encoding, mtime, size, tokens),
+            )
+            connection.commit()
+        except sqlite3.Error:
+            _db.disable()
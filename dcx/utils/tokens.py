@@ -2,19 +2,66 @@
 
 This module provides utilities for estimating token counts in text.
 These are simple approximations and may differ from actual tokenization
-by specific models like GPT or Claude.
+by specific models like GPT or Claude. When the optional tiktoken package
+is installed, counts use OpenAI's cl100k_base encoding instead.
 """
 
+import functools
+import importlib.util
 import re
 import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, NamedTuple, Optional, TextIO, Tuple
+
+from .token_cache import get_cached_tokens, set_cached_tokens
 
 # Simple tokenization regex pattern
 # This is a simplified version that splits on whitespace and punctuation
 # For production use, you would want to use a proper tokenizer from a library
 TOKEN_PATTERN = re.compile(r"\b\w+\b|[^\w\s]")
 
+# ASCII bytes TOKEN_PATTERN treats as word characters and as whitespace,
+# derived from the pattern's own classes so the fast path below agrees with it
+_ASCII_WORD = bytes(b for b in range(128) if re.match(r"\w", chr(b)))
+_ASCII_WORD_OR_SPACE = _ASCII_WORD + bytes(
+    b for b in range(128) if re.match(r"\s", chr(b))
+)
+
+# Maps word bytes to b"w" and everything else to a space
+_ASCII_WORD_TABLE = bytes(
+    ord("w") if b in _ASCII_WORD else ord(" ") for b in range(256)
+)
+
+# Identifies the tokenizer in the persistent token cache; change it whenever
+# count_tokens_simple starts producing different counts
+TOKENIZER_NAME = "simple-regex-v1"
+
+# tiktoken is only checked for here and imported when a file is first counted
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+TIKTOKEN_ENCODING = "cl100k_base"
+TIKTOKEN_TOKENIZER_NAME = f"tiktoken-{TIKTOKEN_ENCODING}"
+
+# Set when tiktoken is installed but its encoding could not be loaded
+_tiktoken_failed = False
+
+# Bytes per token assumed by size-only estimates. Real text averages closer
+# to four, so estimates err on the high side
+BYTES_PER_TOKEN_ESTIMATE = 3
+
+# Number of characters read at a time when counting a file's tokens with
+# count_tokens_simple, so large files are never held in memory whole
+COUNT_CHUNK_SIZE = 64 * 1024
+
+# Matches the run of word characters at the start of a string
+_WORD_RUN = re.compile(r"\w*")
+
+
+class TokenInfo(NamedTuple):
+    """Size and token count of a file."""
+
+    size_bytes: int
+    tokens: int
+
 
 def count_tokens_simple(text: str) -> int:
     """
@@ -32,39 +79,184 @@ def count_tokens_simple(text: str) -> int:
     if not text:
         return 0
 
+    if text.isascii():
+        # A token is a run of word characters or a single other non-space
+        # character, so count both with byte operations instead of building
+        # a string per token
+        data = text.encode("ascii")
+        words = (b" " + data.translate(_ASCII_WORD_TABLE)).count(b" w")
+        return words + len(data.translate(None, _ASCII_WORD_OR_SPACE))
+
     # Find all tokens
     tokens = TOKEN_PATTERN.findall(text)
     return len(tokens)
 
 
-def count_tokens_in_file(file_path: Path) -> Dict[str, int]:
+@functools.lru_cache(maxsize=1)
+def _get_encoding() -> Optional[Any]:
+    """Load the tiktoken encoding once, or return None if it can't be loaded."""
+    global _tiktoken_failed
+
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(TIKTOKEN_ENCODING)
+    except Exception:
+        # The encoding is downloaded on first use, which fails when offline
+        _tiktoken_failed = True
+        return None
+
+
+def get_tokenizer_name() -> str:
+    """Get the name of the tokenizer count_tokens uses, for the token cache."""
+    if TIKTOKEN_AVAILABLE and not _tiktoken_failed:
+        return TIKTOKEN_TOKENIZER_NAME
+    return TOKENIZER_NAME
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in text with the best available tokenizer.
+
+    Uses tiktoken when it is installed, falling back to count_tokens_simple.
+    tiktoken releases the GIL while encoding, so files counted on worker
+    threads are tokenized in parallel.
+
+    Args:
+        text: The text to count tokens in
+
+    Returns:
+        Token count
+    """
+    if TIKTOKEN_AVAILABLE:
+        encoding = _get_encoding()
+        if encoding is not None:
+            return len(encoding.encode_ordinary(text))
+    return count_tokens_simple(text)
+
+
+def _count_tokens_in_stream(f: TextIO) -> int:
+    """
+    Count the tokens in an open text file.
+
+    With the simple tokenizer the file is read in chunks. Each chunk is cut
+    after its last whitespace character and the remainder carried into the
+    next one, so no token is split between chunks. A carry longer than a
+    chunk is cut after its last non-word character instead. tiktoken needs the whole
+    text, since its tokens can span whitespace.
+    """
+    if TIKTOKEN_AVAILABLE and _get_encoding() is not None:
+        return count_tokens(f.read())
+
+    token_count = 0
+    carry = ""
+    while True:
+        chunk = f.read(COUNT_CHUNK_SIZE)
+        if not chunk:
+            break
+        block = carry + chunk
+        if block[-1].isspace():
+            token_count += count_tokens_simple(block)
+            carry = ""
+            continue
+        parts = block.rsplit(None, 1)
+        if len(parts) == 2:
+            token_count += count_tokens_simple(parts[0])
+        carry = parts[-1]
+        if len(carry) > COUNT_CHUNK_SIZE:
+            # Text without whitespace, such as minified code or base64, would
+            # grow the carry by a chunk per read. Count it up to its trailing
+            # run of word characters instead, and carry just the last one:
+            # the run is one token however long it is
+            word_start = len(carry) - _WORD_RUN.match(carry[::-1]).end()
+            token_count += count_tokens_simple(carry[:word_start])
+            carry = carry[word_start:][-1:]
+    return token_count + count_tokens_simple(carry)
+
+
+def count_tokens_in_file(
+    file_path: Path, size_bytes: Optional[int] = None, estimate: bool = False
+) -> TokenInfo:
     """
     Count tokens in a file.
 
+    Counts are cached on disk by path, modification time and size, so
+    unchanged files are not re-read on later invocations.
+
     Args:
         file_path: Path to the file
+        size_bytes: File size if already known from a directory scan; when
+            omitted it is taken from the file's stat
+        estimate: Estimate the count from the file size alone, without
+            reading the file
 
     Returns:
-        Dictionary with token count and file size in bytes
+        TokenInfo with the file size in bytes and token count
     """
-    if not file_path.exists():
-        return {"size_bytes": 0, "tokens": 0}
-
     try:
-        # Get file size
-        size_bytes = file_path.stat().st_size
+        # Estimates and cached counts only need a stat, so the file is
+        # opened only to count it
+        stat = os.stat(file_path)
+        if size_bytes is None:
+            size_bytes = stat.st_size
+
+        if estimate:
+            return TokenInfo(size_bytes, size_bytes // BYTES_PER_TOKEN_ESTIMATE)
+
+        cache_key = os.path.abspath(file_path)
+        token_count = get_cached_tokens(
+            cache_key, get_tokenizer_name(), stat.st_mtime_ns, stat.st_size
+        )
+        if token_count is not None:
+            return TokenInfo(size_bytes, token_count)
 
-        # Read file content
         with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-            content = f.read()
+            # Cache under the metadata of the file actually read, in case it
+            # changed since the stat above
+            stat = os.fstat(f.fileno())
+            token_count = _count_tokens_in_stream(f)
 
-        # Count tokens
-        token_count = count_tokens_simple(content)
+        set_cached_tokens(
+            cache_key, get_tokenizer_name(), stat.st_mtime_ns, stat.st_size, token_count
+        )
 
-        return {"size_bytes": size_bytes, "tokens": token_count}
+        return TokenInfo(size_bytes, token_count)
     except Exception:
-        # Return zeros for any errors
-        return {"size_bytes": 0, "tokens": 0}
+        # Return zeros for missing files and any other errors
+        return TokenInfo(0, 0)
+
+
+def read_file_with_tokens(file_path: Path) -> Tuple[str, int]:
+    """
+    Read a text file and count its tokens in one pass.
+
+    The token count comes from the persistent cache when the file is
+    unchanged, otherwise it is counted from the content just read.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Tuple of (file content, token count)
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        stat = os.fstat(f.fileno())
+        content = f.read()
+
+    cache_key = os.path.abspath(file_path)
+    token_count = get_cached_tokens(
+        cache_key, get_tokenizer_name(), stat.st_mtime_ns, stat.st_size
+    )
+    if token_count is None:
+        token_count = count_tokens(content)
+        set_cached_tokens(
+            cache_key, get_tokenizer_name(), stat.st_mtime_ns, stat.st_size, token_count
+        )
+
+    return content, token_count
 
 
 def format_token_count(count: int) -> str:
@@ -79,7 +271,11 @@ def format_token_count(count: int) -> str:
     """
     if count < 1000:
         return str(count)
-    elif count < 1000000:
-        return f"{count/1000:.1f}K"
-    else:
-        return f"{count/1000000:.1f}M"
+
+    # Round to tenths with integer arithmetic, switching to millions when
+    # the rounded count of thousands would read 1000.0K
+    tenths = (count + 50) // 100
+    if tenths < 10000:
+        return f"{tenths // 10}.{tenths % 10}K"
+    tenths = (count + 50000) // 100000
+    return f"{tenths // 10}.{tenths % 10}M"